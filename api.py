@@ -0,0 +1,295 @@
+"""
+Headless KPI and report API for the Roster Dashboard
+Serves the dashboard's KPIs and chart data for a month/market/state filter
+without a Streamlit session. It uses the same loaders, Parquet cache,
+background refresh and view cache as app.py. Import it, call it from the
+command line, or run it as a small local JSON endpoint.
+
+Usage:
+    python api.py report --month 01-2026 --market TX --state NY
+    python api.py report --sections kpis trend
+    python api.py serve --port 8502
+    curl 'http://127.0.0.1:8502/report?month=01-2026&sections=kpis,failures'
+"""
+
+import argparse
+import json
+import math
+import sys
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import app
+
+SECTIONS = ['kpis', 'trend', 'iterations', 'stages', 'failures', 'durations',
+            'recovery', 'latency']
+ROSTER_SECTIONS = {'stages', 'failures', 'durations'}
+DEFAULT_PORT = 8502
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def _plain(value):
+    """JSON-ready copy of numpy/pandas scalars, periods and timestamps"""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, pd.DataFrame):
+        return _plain(value.to_dict(orient='records'))
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, pd.Period):
+        return str(value)
+    return value
+
+
+def _roster(snapshot, month, state):
+    """
+    Roster rows for the month/state filter and the view-cache key for them;
+    no rows when there is no roster source
+    """
+    months = None if month is None else (app.month_partition(month),)
+    key = (snapshot.roster_version, months, state)
+    if snapshot.roster_version is None:
+        return pd.DataFrame(), key
+    index = app.load_roster_index(app.ROSTER_CSV, snapshot.roster_version, months)
+    return index.select(CNT_STATE=state), key
+
+
+def _distinct(snapshot, month, state):
+    """
+    Distinct-value counts for the month and state filter from the sketches,
+    or None when there is no roster source
+    """
+    if snapshot.roster_version is None:
+        return None
+    months = None if month is None else (app.month_partition(month),)
+    sketches = app.get_distinct_counts(app.ROSTER_CSV).get(snapshot.roster_version)
+    return app.cached_view(('distinct', snapshot.roster_version, months, state),
+                           lambda: app.count_distinct(sketches, months, state))
+
+
+def _recovery(snapshot, month, state, top_n):
+    """Retry-chain recovery numbers for the month (of first run) and state filter"""
+    months = None if month is None else (app.month_partition(month),)
+    key = (snapshot.roster_version, months, state)
+    
+    def build():
+        chains = app.get_retry_chains(app.ROSTER_CSV).get(snapshot.roster_version)
+        chains = app.select_summary(chains, months, state)
+        return {
+            'summary': app.recovery_summary(chains),
+            'by_state': app.recovery_rates(chains, 'CNT_STATE'),
+            'by_organization': app.recovery_rates(chains, 'ORG_NM'),
+            'still_failing': app.still_failing(chains, min_runs=2),
+        }
+    recovery = app.cached_view(('api recovery',) + key, build)
+    return {name: value.head(top_n) if isinstance(value, pd.DataFrame) else value
+            for name, value in recovery.items()}
+
+
+def _latency(snapshot, month, state, top_n):
+    """Stage duration percentiles for the filter, overall and per breakdown, from the sketches"""
+    months = None if month is None else (app.month_partition(month),)
+    key = (snapshot.roster_version, months, state)
+    
+    def build():
+        sketch = app.get_duration_sketches(app.ROSTER_CSV).get(snapshot.roster_version)
+        sketch = app.select_sketches(sketch, months, state)
+        latency = {'overall': app.sketch_quantiles(sketch)}
+        for by in app.SLO_DIMENSIONS:
+            latency[f'by_{by.lower()}'] = (app.sketch_quantiles(sketch, by)
+                                          .sort_values('p95', ascending=False))
+        return latency
+    latency = app.cached_view(('api latency',) + key, build)
+    # Slowest groups per stage for the breakdowns
+    return {name: frame if name == 'overall' else frame.groupby('Stage').head(top_n)
+            for name, frame in latency.items()}
+
+
+def report(month=None, market=None, state=None, sections=SECTIONS, top_n=10):
+    """
+    KPIs and chart data for one filter state as plain JSON-ready values.
+
+    ``month`` is an 'MM-YYYY' label, ``market`` a MARKET and ``state`` a
+    CNT_STATE; None means all. Only the requested ``sections`` are built,
+    and the roster table is only loaded for stages, failures and durations
+    (recovery reads the retry-chain index, latency the duration sketches).
+    """
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+
+    snapshot = app.get_data_store().snapshot
+    cube = snapshot.cube
+    metrics_key = (snapshot.metrics_version, market)
+    result = {
+        'filters': {'month': month, 'market': market, 'state': state},
+        'loaded_at': snapshot.loaded_at,
+    }
+
+    if 'kpis' in sections:
+        distinct = _distinct(snapshot, month, state)
+        kpis = app.cached_view(
+            ('api kpis', snapshot.metrics_version, snapshot.roster_version, month, market, state),
+            lambda: app.compute_kpis(cube, None, month, market, distinct)
+        )
+        result['kpis'] = dict(kpis, distinct=distinct and {
+            col: {'count': count, 'exact': exact} for col, (count, exact) in distinct.items()})
+    if 'trend' in sections:
+        trend = app.cached_view(('api trend',) + metrics_key,
+                                lambda: app.monthly_success_rates(cube, market))
+        result['trend'] = trend[['MONTH', 'Success_Rate', 'OVERALL_SCS_CNT', 'OVERALL_FAIL_CNT']]
+    if 'iterations' in sections:
+        iterations = app.cached_view(('api iterations',) + metrics_key,
+                                     lambda: app.iteration_breakdown(cube, market))
+        result['iterations'] = [] if iterations is None else iterations[
+            ['MONTH', 'MARKET', 'FIRST_ITER_SCS_CNT', 'Recovery', 'Total_Volume']]
+
+    if ROSTER_SECTIONS & set(sections):
+        roster_df, roster_key = _roster(snapshot, month, state)
+        if 'stages' in sections and 'LATEST_STAGE_NM' in roster_df.columns:
+            result['stages'] = app.cached_view(('api stages',) + roster_key,
+                                               lambda: app.stage_distribution(roster_df))
+        if 'failures' in sections:
+            ranking = app.cached_view(
+                ('failure ranking',) + roster_key,
+                lambda: app.rank_failures(roster_df, app.FAILURE_DIMENSIONS, 10)
+            )
+            result['failures'] = {col: frame.head(top_n) for col, frame in ranking.items()}
+        if 'durations' in sections:
+            result['durations'] = app.cached_view(('api durations',) + roster_key,
+                                                  lambda: app.duration_quantiles(roster_df))
+    
+    if 'recovery' in sections:
+        result['recovery'] = _recovery(snapshot, month, state, top_n)
+    if 'latency' in sections:
+        result['latency'] = _latency(snapshot, month, state, top_n)
+
+    return _plain(result)
+
+
+def options():
+    """Filter values accepted by ``report`` for the current data"""
+    snapshot = app.get_data_store().snapshot
+    roster_df, _ = _roster(snapshot, None, None)
+    states = sorted(roster_df['CNT_STATE'].astype(str).unique()) if 'CNT_STATE' in roster_df else []
+    return _plain({
+        'months': snapshot.cube.months,
+        'markets': snapshot.cube.markets,
+        'states': states,
+        'sections': SECTIONS,
+        'loaded_at': snapshot.loaded_at,
+    })
+
+
+# ============================================================================
+# HTTP ENDPOINT
+# ============================================================================
+
+class ReportHandler(BaseHTTPRequestHandler):
+    """
+    GET /report?month=&market=&state=&sections=a,b&top_n=
+    GET /options
+    GET /health
+    """
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == '/health':
+                self._send(200, {'status': 'ok'})
+            elif url.path == '/options':
+                self._send(200, options())
+            elif url.path == '/report':
+                sections = params.get('sections')
+                self._send(200, report(
+                    month=params.get('month') or None,
+                    market=params.get('market') or None,
+                    state=params.get('state') or None,
+                    sections=sections.split(',') if sections else SECTIONS,
+                    top_n=int(params.get('top_n', 10)),
+                ))
+            else:
+                self._send(404, {'error': f"Unknown path {url.path}"})
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def log_message(self, format, *args):
+        app.LOGGER.info("%s - %s", self.address_string(), format % args)
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT):
+    """Serve the JSON endpoint until interrupted"""
+    # Load once up front so the first request doesn't pay for ingestion
+    app.get_data_store()
+    server = ThreadingHTTPServer((host, port), ReportHandler)
+    print(f"Serving roster reports on http://{host}:{port}/report")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    report_cmd = commands.add_parser('report', help='print one report as JSON')
+    report_cmd.add_argument('--month', help="month label, e.g. 01-2026 (default: all)")
+    report_cmd.add_argument('--market', help='market (default: all)')
+    report_cmd.add_argument('--state', help='roster state (default: all)')
+    report_cmd.add_argument('--sections', nargs='+', default=SECTIONS, choices=SECTIONS)
+    report_cmd.add_argument('--top-n', type=int, default=10)
+
+    commands.add_parser('options', help='print the available filter values as JSON')
+
+    serve_cmd = commands.add_parser('serve', help='run the local HTTP/JSON endpoint')
+    serve_cmd.add_argument('--host', default='127.0.0.1')
+    serve_cmd.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.host, args.port)
+    elif args.command == 'options':
+        print(json.dumps(options(), indent=2))
+    else:
+        print(json.dumps(report(args.month, args.market, args.state,
+                                args.sections, args.top_n), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
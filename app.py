@@ -5,21 +5,120 @@ HiLabs Workshop @ E-Summit IIT Roorkee
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from pandas.api.types import union_categoricals
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing, contextmanager, nullcontext
 from datetime import datetime
+from functools import partial
+import csv
+import glob
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
 import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
 
-# Page configuration
-st.set_page_config(
-    page_title="Roster Processing Dashboard",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Source files and the on-disk cache of cleaned frames. The roster source may
+# also be a directory of partition CSVs or a glob (ROSTER_SOURCE overrides it)
+ROSTER_CSV = os.environ.get('ROSTER_SOURCE', 'roster_processing_details.csv')
+METRICS_CSV = 'aggregated_operational_metrics.csv'
+CACHE_DIR = '.roster_cache'
+# Bump whenever the cleaning rules or cache layout change so existing
+# caches are rebuilt
+CACHE_FORMAT_VERSION = 6
+HASH_BLOCK_SIZE = 1 << 20
+# Bytes before the last ingested offset that must be unchanged for an
+# append-only refresh
+APPEND_ANCHOR_BYTES = 64 * 1024
+# A month's appended parts are compacted back into one file beyond this count
+MAX_CACHE_PARTS = 32
+# Cached roster parts are split by the month of this column so a one-month
+# view only reads that month's files
+ROSTER_MONTH_COLUMN = 'FILE_RECEIVED_DT'
+UNKNOWN_MONTH = 'unknown'
+
+# Roster columns the dashboard reads; everything else is dropped at parse time
+ROSTER_COLUMNS = [
+    'RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'SRC_SYS', 'RUN_NO',
+    'IS_FAILED', 'IS_STUCK', 'FAILURE_STATUS', 'LATEST_STAGE_NM',
+    'SPS_LOAD_HEALTH', 'PRE_PROCESSING_DURATION', 'ISF_GEN_DURATION',
+    'DART_GEN_DURATION', 'SPS_LOAD_DURATION', 'FILE_RECEIVED_DT',
+    'LATEST_OBJECT_RUN_DT', 'LAST_UPDT_DT',
+]
+
+# Compact dtypes applied to the cleaned tables. Low-cardinality text becomes
+# 'category' (so groupby/value_counts work on integer codes), 'count' means
+# the narrowest integer that holds the data and 'flag' an int8 that is 1
+# exactly where the value is 1 (what every ``== 1`` filter tests), so an
+# out-of-range code like 257 cannot wrap around into a flag.
+ROSTER_SCHEMA = {
+    'ORG_NM': 'category',
+    'CNT_STATE': 'category',
+    'LOB': 'category',
+    'SRC_SYS': 'category',
+    'FAILURE_STATUS': 'category',
+    'LATEST_STAGE_NM': 'category',
+    'SPS_LOAD_HEALTH': 'category',
+    'PRE_PROCESSING_HEALTH': 'category',
+    'ISF_GEN_HEALTH': 'category',
+    'DART_GEN_HEALTH': 'category',
+    'IS_FAILED': 'flag',
+    'IS_STUCK': 'flag',
+    'RUN_NO': 'count',
+    'FILE_STATUS_CD': 'count',
+    'PRE_PROCESSING_DURATION': 'float32',
+    'ISF_GEN_DURATION': 'float32',
+    'DART_GEN_DURATION': 'float32',
+    'SPS_LOAD_DURATION': 'float32',
+}
+# Metric counts stay int64: they are summed across markets and months
+METRICS_SCHEMA = {
+    'MARKET': 'category',
+    'CLIENT_ID': 'category',
+    'FIRST_ITER_SCS_CNT': 'int64',
+    'FIRST_ITER_FAIL_CNT': 'int64',
+    'NEXT_ITER_SCS_CNT': 'int64',
+    'NEXT_ITER_FAIL_CNT': 'int64',
+    'OVERALL_SCS_CNT': 'int64',
+    'OVERALL_FAIL_CNT': 'int64',
+    'SCS_PERCENT': 'float32',
+}
+# Rows parsed per chunk by the streaming roster reader (override with the
+# ROSTER_CHUNK_ROWS environment variable)
+ROSTER_CHUNK_ROWS = int(os.environ.get('ROSTER_CHUNK_ROWS', 100_000))
+# Directory shared by every dashboard process on the host. When set, the
+# cleaned roster table is published there once as an Arrow IPC file that all
+# processes memory-map read-only instead of each holding a private copy
+DATA_PLANE_DIR = os.environ.get('ROSTER_DATA_PLANE')
+# A cache or publish lock file older than this many seconds is treated as
+# abandoned
+LOCK_TIMEOUT = 600
+# Processes used to ingest partitioned roster exports (ROSTER_WORKERS
+# overrides it; 1 loads partitions serially)
+ROSTER_WORKERS = int(os.environ.get('ROSTER_WORKERS', 0)) or os.cpu_count() or 1
+# 'sqlite' keeps the cleaned tables in indexed SQLite files under CACHE_DIR
+# and answers the roster views with queries instead of in-memory pandas
+ROSTER_BACKEND = os.environ.get('ROSTER_BACKEND', 'pandas')
+# Data versions whose loaded tables stay in memory: the snapshot being served
+# and the one the background refresh is building
+CACHED_VERSIONS = 2
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     /* Enhanced KPI Card Styling */
     div[data-testid="stMetricValue"] {
@@ -94,63 +193,951 @@ st.markdown("""
         box-shadow: 0 12px 30px rgba(0, 0, 0, 0.3);
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+
+def configure_page():
+    """Page configuration and custom CSS (called from main so app.py imports cleanly)"""
+    st.set_page_config(
+        page_title="Roster Processing Dashboard",
+        page_icon="📊",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 # ============================================================================
-# DATA LOADING & CLEANING
+# INSTRUMENTATION
 # ============================================================================
 
-@st.cache_data
-def load_roster_processing_details():
-    """Load and clean roster processing details CSV"""
+PERF_LOGGER = logging.getLogger('roster_dashboard.perf')
+# Append one JSON line per instrumented stage to this file when set
+PERF_LOG_PATH = os.environ.get('ROSTER_PERF_LOG')
+
+# Per-thread collector for the current rerun; unset outside a run, in which
+# case instrument() only times the block
+_perf_state = threading.local()
+
+# tracemalloc is process-wide: it runs while any thread's rerun tracks
+# memory, and only a run tracing alone resets and reports peaks
+_tracing_threads = set()
+_tracing_lock = threading.Lock()
+
+
+def _set_tracing(enabled):
+    """Add or remove this thread's claim on tracemalloc, starting or stopping it"""
+    with _tracing_lock:
+        # Runs cut short by a rerun never finished; drop their dead threads
+        _tracing_threads.intersection_update(threading.enumerate())
+        if enabled:
+            _tracing_threads.add(threading.current_thread())
+        else:
+            _tracing_threads.discard(threading.current_thread())
+        if _tracing_threads and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not _tracing_threads and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _tracing_alone():
+    with _tracing_lock:
+        return _tracing_threads == {threading.current_thread()}
+
+
+def start_perf_run(track_memory=False):
+    """Begin collecting stage records for this rerun"""
+    _perf_state.records = []
+    _perf_state.stack = []
+    _perf_state.track_memory = track_memory
+    _set_tracing(track_memory)
+
+
+def finish_perf_run():
+    """Stop collecting and return this rerun's stage records"""
+    records = getattr(_perf_state, 'records', None) or []
+    _perf_state.records = None
+    if getattr(_perf_state, 'track_memory', False):
+        _perf_state.track_memory = False
+        _set_tracing(False)
+    return records
+
+
+@contextmanager
+def instrument(stage, rows_in=None, cached=False):
+    """
+    Time a pipeline stage and record wall time, rows in/out, peak traced
+    allocation and (for ``cached=True``) cache hit/miss. Yields the record
+    so the block can fill in ``rows_out``.
+
+    The peak is process-wide, so it includes other sessions' allocations
+    made meanwhile; a stage that starts while another rerun is also tracing
+    records no peak rather than resetting the one that rerun is measuring.
+    """
+    record = {'stage': stage, 'rows_in': rows_in, 'rows_out': None}
+    if cached:
+        record['cache'] = 'hit'
+    records = getattr(_perf_state, 'records', None)
+    if records is None:
+        yield record
+        return
+    
+    track_memory = (_perf_state.track_memory and tracemalloc.is_tracing()
+                    and _tracing_alone())
+    stack = _perf_state.stack
+    if track_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        # Keep the enclosing stage's peak before resetting for this one
+        if stack and '_peak' in stack[-1]:
+            stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)
+        tracemalloc.reset_peak()
+        record['_base'], record['_peak'] = current, current
+    stack.append(record)
+    records.append(record)
+    started = time.perf_counter()
     try:
-        df = pd.read_csv('roster_processing_details.csv')
-        
-        # Clean numeric columns
-        numeric_cols = ['RUN_NO', 'IS_FAILED', 'IS_STUCK', 'FILE_STATUS_CD',
-                       'PRE_PROCESSING_DURATION', 'ISF_GEN_DURATION', 
-                       'DART_GEN_DURATION', 'SPS_LOAD_DURATION']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        yield record
+    finally:
+        record['seconds'] = round(time.perf_counter() - started, 6)
+        stack.pop()
+        if track_memory:
+            peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+            record['peak_mb'] = round((peak - record.pop('_base')) / 1e6, 3)
+            if stack and '_peak' in stack[-1]:
+                stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)
+
+
+def mark_cache_miss():
+    """Flag the innermost cached stage as a miss (call from inside the cached body)"""
+    for record in reversed(getattr(_perf_state, 'stack', None) or []):
+        if 'cache' in record:
+            record['cache'] = 'miss'
+            return
+
+
+def export_perf_records(records):
+    """Emit each stage record as one structured JSON log line"""
+    if PERF_LOG_PATH and not any(getattr(h, 'baseFilename', None) == os.path.abspath(PERF_LOG_PATH)
+                                 for h in PERF_LOGGER.handlers):
+        PERF_LOGGER.addHandler(logging.FileHandler(PERF_LOG_PATH))
+        PERF_LOGGER.setLevel(logging.INFO)
+    run_at = datetime.now().isoformat(timespec='milliseconds')
+    for record in records:
+        PERF_LOGGER.info(json.dumps({'run_at': run_at, **record}))
+
+
+def render_perf_panel(records):
+    """Sidebar breakdown of this rerun's cost per stage"""
+    with st.sidebar.expander("🛠️ Performance", expanded=True):
+        if not records:
+            st.caption("No stages recorded")
+            return
+        raw = pd.DataFrame(records)
+        for col in ['cache', 'peak_mb']:
+            if col not in raw.columns:
+                raw[col] = None
+        # Per-chunk stages (read_csv, clean) are summed into one row each
+        report = raw.groupby('stage', sort=False).agg(
+            calls=('stage', 'size'),
+            seconds=('seconds', 'sum'),
+            rows_in=('rows_in', lambda s: s.sum(min_count=1)),
+            rows_out=('rows_out', lambda s: s.sum(min_count=1)),
+            peak_mb=('peak_mb', 'max'),
+            cache=('cache', 'first'),
+        ).reset_index()
+        st.dataframe(report, use_container_width=True, hide_index=True)
+        st.caption(
+            f"{len(report)} stages, {len(raw)} records "
+            "(nested stages are counted in their parent too). Peak memory is "
+            "process-wide and left blank for stages run while another session "
+            "also had this panel open"
+        )
+        st.download_button(
+            label="⬇️ Export timings (JSON)",
+            data=raw.to_json(orient='records'),
+            file_name=f"perf_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
+
+
+# ============================================================================
+# COLUMNAR CACHE
+# ============================================================================
+
+def source_files(path):
+    """CSV files behind a source: the file itself, a directory's *.csv or a glob's matches"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.csv')))
+    if any(c in path for c in '*?['):
+        return sorted(glob.glob(path))
+    return [path]
+
+
+def source_version(path):
+    """
+    Cheap change token for a source: (size, mtime) for a single file, one
+    (name, size, mtime) per partition for a directory or glob, or None if
+    nothing is there
+    """
+    files = source_files(path)
+    versions = []
+    for name in files:
+        try:
+            stat = os.stat(name)
+        except OSError:
+            return None
+        versions.append((name, stat.st_size, stat.st_mtime_ns))
+    if files == [path]:
+        return versions[0][1:]
+    return tuple(versions) or None
+
+
+def source_ends(path, version=None):
+    """
+    ``{file: byte length}`` for the CSV files behind ``path`` as of
+    ``version`` (a ``source_version`` token), so a reader can ignore rows
+    appended after it. Without a version every file is read to its current
+    end (None).
+    """
+    if version is None:
+        return {name: None for name in source_files(path)}
+    if not isinstance(version[0], (tuple, list)):
+        return {path: version[0]}
+    return {name: size for name, size, _ in version}
+
+
+def hash_file(path, start=0, end=None):
+    """Content hash of a file (or of the byte range [start, end)), read in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with instrument('hash source'), open(path, 'rb') as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            size = HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining)
+            block = f.read(size)
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _lock_file(path):
+    """Cross-process lock: the process that creates ``path`` holds it until it is removed"""
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > LOCK_TIMEOUT:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            time.sleep(0.2)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+# One lock per cache directory for the threads of this process (reruns and
+# the background refresh); the lock file covers other processes
+_cache_locks = {}
+_cache_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _cache_lock(cache_dir):
+    """Held while a source's cache is checked and updated, so one writer at a time"""
+    with _cache_locks_guard:
+        lock = _cache_locks.setdefault(cache_dir, threading.Lock())
+    with lock:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            shared = os.access(CACHE_DIR, os.W_OK)
+        except OSError:
+            shared = False
+        # Without a writable CACHE_DIR no process can write the cache either
+        with _lock_file(cache_dir + '.lock') if shared else nullcontext():
+            yield
+
+
+def _cache_dir(path):
+    """Directory holding the Parquet parts and metadata for a source CSV"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    # Partitions in different directories may share a file name
+    where = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=4).hexdigest()
+    return os.path.join(CACHE_DIR, f'{stem}-{where}')
+
+
+def _read_cache_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, '_meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != CACHE_FORMAT_VERSION:
+        return None
+    if not all(os.path.exists(os.path.join(cache_dir, p)) for p in meta['parts']):
+        return None
+    return meta
+
+
+def _write_json(path, value):
+    """Replace ``path`` with ``value`` as JSON in one rename, never half-written"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+
+def _write_cache_meta(cache_dir, meta):
+    _write_json(os.path.join(cache_dir, '_meta.json'), meta)
+
+
+def month_keys(df):
+    """Partition key per row: 'YYYY-MM' of ROSTER_MONTH_COLUMN, UNKNOWN_MONTH where missing"""
+    if ROSTER_MONTH_COLUMN not in df.columns:
+        return pd.Series(UNKNOWN_MONTH, index=df.index)
+    dates = pd.to_datetime(df[ROSTER_MONTH_COLUMN], errors='coerce')
+    # Format each distinct month once instead of every row
+    codes = (dates.dt.year * 100 + dates.dt.month).fillna(-1).astype('int32')
+    unique = np.unique(codes.to_numpy())
+    labels = [UNKNOWN_MONTH if c < 0 else f'{c // 100:04d}-{c % 100:02d}' for c in unique]
+    return pd.Series(np.asarray(labels, dtype=object)[np.searchsorted(unique, codes)],
+                     index=df.index)
+
+
+def month_partition(month):
+    """Roster partition key ('YYYY-MM') for a metrics MONTH label ('MM-YYYY')"""
+    parsed = pd.to_datetime(month, format='%m-%Y', errors='coerce')
+    return UNKNOWN_MONTH if pd.isna(parsed) else parsed.strftime('%Y-%m')
+
+
+def filter_months(df, months):
+    """Rows of ``df`` whose month key is in ``months`` (None keeps everything)"""
+    if months is None or df.empty:
+        return df
+    return df[month_keys(df).isin(months).to_numpy()].reset_index(drop=True)
+
+
+def _part_month(name):
+    # part-<index>-<month>.parquet
+    return name.split('-', 2)[2].rsplit('.', 1)[0]
+
+
+def _write_part(cache_dir, df, index, month):
+    name = f'part-{index:05d}-{month}.parquet'
+    tmp_path = os.path.join(cache_dir, '.' + name + '.tmp')
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(cache_dir, name))
+    return name
+
+
+def _write_parts(cache_dir, df, index):
+    """Write ``df`` as one Parquet part per month, all numbered ``index``"""
+    if df.empty:
+        return [_write_part(cache_dir, df, index, UNKNOWN_MONTH)]
+    keys = month_keys(df)
+    return [_write_part(cache_dir, rows.reset_index(drop=True), index, month)
+            for month, rows in df.groupby(keys.to_numpy(), sort=True)]
+
+
+def _compact_parts(cache_dir, parts, index):
+    """Merge the parts of any month with more than MAX_CACHE_PARTS files into one"""
+    by_month = {}
+    for name in parts:
+        by_month.setdefault(_part_month(name), []).append(name)
+    for month, names in by_month.items():
+        if len(names) <= MAX_CACHE_PARTS:
+            continue
+        merged = _write_part(cache_dir, _read_parts(cache_dir, names), index, month)
+        # Keep the merged file where the month's first part was so row order holds
+        parts = [merged if p == names[0] else p for p in parts if p == names[0] or p not in names]
+    return parts
+
+
+def _read_parts(cache_dir, parts, months=None):
+    with instrument('read cached parquet', rows_in=len(parts)) as record:
+        selected = [p for p in parts if months is None or _part_month(p) in months]
+        if selected:
+            df = concat_compact([pd.read_parquet(os.path.join(cache_dir, p)) for p in selected])
+        else:
+            # Nothing in the requested months - keep the columns and dtypes
+            df = pd.read_parquet(os.path.join(cache_dir, parts[0])).iloc[:0]
+        record['rows_out'] = len(df)
+    return df
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        return f.readline().decode('utf-8', errors='replace')
+
+
+def _anchor_matches(path, meta):
+    """True if the bytes up to the cached offset still look like what we ingested"""
+    offset = meta['offset']
+    start = max(0, offset - APPEND_ANCHOR_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(offset - 1)
+        ends_on_newline = f.read(1) == b'\n'
+    return (ends_on_newline
+            and _read_header(path) == meta['header']
+            and hash_file(path, start, offset) == meta['anchor'])
+
+
+class _FileHead(io.RawIOBase):
+    """The first ``size`` bytes of an open binary file, as a readable stream"""
+    
+    def __init__(self, f, size):
+        self._f = f
+        self._remaining = size
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        count = self._f.readinto(memoryview(buffer)[:max(self._remaining, 0)])
+        self._remaining -= count
+        return count
+
+
+def _read_head(path, read_fn, size):
+    """``read_fn`` over bytes [0, size) of ``path`` only, ignoring anything appended since"""
+    with open(path, 'rb') as f:
+        return read_fn(io.BufferedReader(_FileHead(f, size), HASH_BLOCK_SIZE))
+
+
+def _ingest_appended_tail(path, meta, read_fn, end):
+    """Parse and clean only the bytes appended since the last ingest, up to ``end``"""
+    offset = meta['offset']
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        tail = f.read(end - offset)
+    # Leave a partially written last line for the next refresh
+    complete = tail.rfind(b'\n') + 1
+    if complete == 0:
+        return None, offset
+    tail = tail[:complete]
+    
+    names = next(csv.reader([meta['header']]))
+    return read_fn(io.BytesIO(tail), names=names), offset + complete
+
+
+def _remove_parts(cache_dir, keep):
+    """Delete part files not in ``keep``, skipping any that cannot go yet"""
+    for name in os.listdir(cache_dir):
+        if name.startswith('part-') and name not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def _update_cache(path, read_fn, end=None):
+    """
+    Bring the Parquet cache of ``path`` up to byte ``end`` (default: the
+    current size) without reading it back; the cases are listed under
+    ``load_cached_frame``. Returns ``(meta, extra)``: the cache metadata
+    (None if it could not be written or is already past ``end``) and a
+    cleaned frame of the rows its parts lack (None if there are none).
+    """
+    cache_dir = _cache_dir(path)
+    with _cache_lock(cache_dir):
+        stat = os.stat(path)
+        end = stat.st_size if end is None else min(end, stat.st_size)
+        meta = _read_cache_meta(cache_dir)
         
-        # Parse dates
-        date_cols = ['FILE_RECEIVED_DT', 'LATEST_OBJECT_RUN_DT', 
-                    'CREAT_DT', 'LAST_UPDT_DT']
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+        if meta and meta['offset'] > end and end < stat.st_size:
+            # An older version of a file that has grown since, and the cache
+            # already holds the newer rows. The layout before the last append
+            # stays on disk for one more update, so the version just before
+            # it is served from its parts; anything older re-reads the old
+            # bytes and leaves the cache alone
+            previous = meta.get('previous')
+            if (previous and previous['offset'] == end
+                    and all(os.path.exists(os.path.join(cache_dir, p)) for p in previous['parts'])):
+                return dict(meta, offset=end, parts=previous['parts']), None
+            return None, _read_head(path, read_fn, end)
+        if meta and meta['offset'] == end:
+            if meta['mtime_ns'] == stat.st_mtime_ns:
+                return meta, None
+            start = 0
+            unchanged = True
+            for segment in meta['segments']:
+                if hash_file(path, start, segment['end']) != segment['hash']:
+                    unchanged = False
+                    break
+                start = segment['end']
+            if unchanged:
+                # Touched (or appended to past ``end``) but the cached bytes
+                # are as they were - refresh the mtime key only
+                meta['mtime_ns'] = stat.st_mtime_ns
+                _write_cache_meta(cache_dir, meta)
+                return meta, None
+        elif meta and meta['offset'] < end and _anchor_matches(path, meta):
+            tail_df, new_offset = _ingest_appended_tail(path, meta, read_fn, end)
+            if tail_df is None or tail_df.empty:
+                return meta, None
+            try:
+                next_part = meta['next_part']
+                written = meta['parts'] + _write_parts(cache_dir, tail_df, next_part)
+                parts = _compact_parts(cache_dir, written, next_part + 1)
+                updated = dict(meta, **{
+                    'offset': new_offset,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'anchor': hash_file(path, max(0, new_offset - APPEND_ANCHOR_BYTES),
+                                        new_offset),
+                    'segments': meta['segments'] + [
+                        {'end': new_offset, 'hash': hash_file(path, meta['offset'], new_offset)}
+                    ],
+                    'parts': parts,
+                    'next_part': next_part + 2,
+                    'previous': {'offset': meta['offset'], 'parts': meta['parts']},
+                })
+                _write_cache_meta(cache_dir, updated)
+            except (OSError, ImportError, ValueError):
+                # Serve the tail from memory on top of the parts already cached
+                return meta, tail_df
+            # Parts of the previous layout stay for one more update, for
+            # readers that listed them before this one
+            _remove_parts(cache_dir, set(parts) | set(meta['parts']))
+            return updated, None
         
-        # Clean text fields
-        text_cols = ['RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'SRC_SYS', 
-                    'SPS_LOAD_HEALTH', 'FAILURE_STATUS', 'LATEST_STAGE_NM',
-                    'PRE_PROCESSING_HEALTH', 'ISF_GEN_HEALTH', 'DART_GEN_HEALTH']
-        for col in text_cols:
-            if col in df.columns:
-                df[col] = df[col].fillna('Unknown').astype(str).str.strip()
+        # Only the bytes up to ``end``: rows appended meanwhile are left for
+        # the next refresh, past the offset recorded below
+        content_hash = hash_file(path, 0, end)
+        df = _read_head(path, read_fn, end)
         
-        return df
+        # The cache is an optimization; a read-only or full disk must not
+        # stop the dashboard from loading
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Numbered after the previous layout's parts, which stay for now
+            next_part = meta['next_part'] if meta else 0
+            _remove_parts(cache_dir, set(meta['parts']) if meta else set())
+            updated = {
+                'format': CACHE_FORMAT_VERSION,
+                'offset': end,
+                'mtime_ns': stat.st_mtime_ns,
+                'header': _read_header(path),
+                'anchor': hash_file(path, max(0, end - APPEND_ANCHOR_BYTES), end),
+                'segments': [{'end': end, 'hash': content_hash}],
+                'parts': _write_parts(cache_dir, df, next_part),
+                'next_part': next_part + 1,
+            }
+            _write_cache_meta(cache_dir, updated)
+        except (OSError, ImportError, ValueError):
+            return None, df
+        return updated, None
+
+
+def load_cached_frame(path, read_fn, months=None, end=None):
+    """
+    Return the cleaned frame for ``path``, reusing the Parquet parts cached
+    in CACHE_DIR.
+
+    ``read_fn(source, names=None)`` parses and cleans CSV data from a binary
+    file object; ``names`` is given when reading a headerless appended tail.
+    Parts are stored one file per month of ROSTER_MONTH_COLUMN; with
+    ``months`` (a collection of 'YYYY-MM' keys) only those months' parts are
+    read and returned.
+
+    The cache remembers the byte offset, header and per-segment content
+    hashes of everything ingested so far:
+
+    * same size and mtime - the cached parts are trusted as-is
+    * same size, new mtime - confirmed by re-hashing each ingested segment
+    * file grew and the bytes just before the old offset are unchanged - only
+      the appended tail is parsed, cleaned and stored as new parts
+    * anything else - the CSV is re-read and re-cleaned from scratch
+
+    With ``end`` only the first ``end`` bytes count, as if nothing had been
+    appended since the file was that long. Updates hold a per-source lock
+    (a thread lock plus a lock file next to the cache), so concurrent
+    reruns, the background refresh and other processes never write the
+    same cache at once.
+    """
+    meta, extra = _update_cache(path, read_fn, end)
+    frames = []
+    if meta is not None:
+        frames.append(_read_parts(_cache_dir(path), meta['parts'], months))
+    if extra is not None:
+        frames.append(filter_months(extra, months))
+    return concat_compact(frames)
+
+
+def cached_parts(path, read_fn, version=None):
+    """
+    ``(key, load)`` for every cached Parquet part of the sources behind
+    ``path`` (as of ``version``, see ``source_ends``), bringing each
+    source's cache up to date first. ``key`` identifies the part file's
+    contents (None for rows the cache could not take) and ``load()`` reads
+    it, so callers can go one part at a time and skip parts they have
+    already processed. Parts are not read here.
+    """
+    for source, end in source_ends(path, version).items():
+        meta, extra = _update_cache(source, read_fn, end)
+        if meta is not None:
+            cache_dir = _cache_dir(source)
+            for part in meta['parts']:
+                part_path = os.path.join(cache_dir, part)
+                stat = os.stat(part_path)
+                yield ((part_path, stat.st_size, stat.st_mtime_ns),
+                       partial(pd.read_parquet, part_path))
+        if extra is not None:
+            yield None, lambda extra=extra: extra
+
+
+# ============================================================================
+# SHARED DATA PLANE
+# ============================================================================
+
+def _plane_name(kind, path):
+    """File stem for a published table, unique per source path"""
+    where = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=4).hexdigest()
+    return f'{kind}-{where}'
+
+
+def _read_pointer(name):
+    """Current publication of ``name``: counter, source version, file, partition offsets"""
+    try:
+        with open(os.path.join(DATA_PLANE_DIR, f'{name}.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _plane_lock(name):
+    """Cross-process lock held while one process ingests and publishes ``name``"""
+    return _lock_file(os.path.join(DATA_PLANE_DIR, f'{name}.lock'))
+
+
+def publish_frame(name, version, df, split_by=None):
+    """
+    Write ``df`` as the next numbered Arrow IPC file for ``name`` and point
+    readers at it. With ``split_by`` rows are grouped by its key per row and
+    each key's (offset, length) is recorded so readers can map one slice.
+    """
+    import pyarrow as pa
+    
+    offsets = {}
+    if split_by is not None and len(df):
+        keys = split_by(df).to_numpy()
+        order = np.argsort(keys, kind='stable')
+        df, keys = df.take(order).reset_index(drop=True), keys[order]
+        unique, starts = np.unique(keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+        offsets = {k: [int(s), int(e - s)] for k, s, e in zip(unique, starts, ends)}
+    
+    previous = _read_pointer(name)
+    counter = (previous['counter'] if previous else 0) + 1
+    file_name = f'{name}-{counter:06d}.arrow'
+    path = os.path.join(DATA_PLANE_DIR, file_name)
+    # One contiguous record batch, so a slice maps straight onto the file
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    with pa.OSFile(path + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(df), 1))
+    os.replace(path + '.tmp', path)
+    
+    pointer = {'counter': counter, 'version': json.loads(json.dumps(version)),
+               'file': file_name, 'rows': len(df), 'offsets': offsets}
+    _write_json(os.path.join(DATA_PLANE_DIR, f'{name}.json'), pointer)
+    
+    # Keep the previous file for processes still switching over; older ones
+    # can go (on Windows a file that is still mapped stays until next time)
+    for old in os.listdir(DATA_PLANE_DIR):
+        if (old.startswith(name + '-') and old.endswith('.arrow')
+                and old not in (file_name, previous and previous['file'])):
+            try:
+                os.remove(os.path.join(DATA_PLANE_DIR, old))
+            except OSError:
+                pass
+    return pointer
+
+
+def attach_frame(pointer, keys=None):
+    """
+    Read-only pandas view of a published table, memory-mapped so numeric
+    columns share the page cache with every other process. With ``keys``
+    only those partitions' rows are mapped.
+    """
+    import pyarrow as pa
+    
+    source = pa.memory_map(os.path.join(DATA_PLANE_DIR, pointer['file']), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    if keys is not None:
+        slices = [table.slice(*pointer['offsets'][k]) for k in keys if k in pointer['offsets']]
+        table = pa.concat_tables(slices) if slices else table.slice(0, 0)
+    return table.to_pandas(split_blocks=True)
+
+
+def shared_frame(name, version, build, split_by=None, keys=None):
+    """
+    Frame ``name`` at ``version`` from the data plane. The first process to
+    need a version calls ``build()`` and publishes it under a lock; every
+    other process just maps the published file.
+    """
+    version = json.loads(json.dumps(version))
+    pointer = _read_pointer(name)
+    if pointer is None or pointer['version'] != version:
+        os.makedirs(DATA_PLANE_DIR, exist_ok=True)
+        with _plane_lock(name):
+            # Another process may have published while we waited
+            pointer = _read_pointer(name)
+            if pointer is None or pointer['version'] != version:
+                with instrument('publish data plane') as record:
+                    pointer = publish_frame(name, version, build(), split_by)
+                    record['rows_out'] = pointer['rows']
+    with instrument('attach data plane') as record:
+        df = attach_frame(pointer, keys)
+        record['rows_out'] = len(df)
+    return df
+
+
+# ============================================================================
+# DATA LOADING & CLEANING
+# ============================================================================
+
+def clean_roster_details(df):
+    """Apply the roster cleaning rules: numeric coercion, date parsing, text fill"""
+    # Clean numeric columns
+    numeric_cols = ['RUN_NO', 'IS_FAILED', 'IS_STUCK', 'FILE_STATUS_CD',
+                   'PRE_PROCESSING_DURATION', 'ISF_GEN_DURATION', 
+                   'DART_GEN_DURATION', 'SPS_LOAD_DURATION']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    
+    # Parse dates
+    date_cols = ['FILE_RECEIVED_DT', 'LATEST_OBJECT_RUN_DT', 
+                'CREAT_DT', 'LAST_UPDT_DT']
+    for col in date_cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    
+    # Clean text fields
+    text_cols = ['RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'SRC_SYS', 
+                'SPS_LOAD_HEALTH', 'FAILURE_STATUS', 'LATEST_STAGE_NM',
+                'PRE_PROCESSING_HEALTH', 'ISF_GEN_HEALTH', 'DART_GEN_HEALTH']
+    for col in text_cols:
+        if col in df.columns:
+            df[col] = df[col].fillna('Unknown').astype(str).str.strip()
+    
+    return df
+
+
+def apply_schema(df, schema):
+    """Cast cleaned columns to the compact dtypes declared in ``schema``"""
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        if dtype == 'count':
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        elif dtype == 'flag':
+            df[col] = (df[col].to_numpy() == 1).astype('int8')
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def concat_compact(frames):
+    """
+    Concatenate frames, unifying categorical columns first so the result
+    stays categorical instead of falling back to object strings. Unified
+    categories are sorted, like those of a single ``astype('category')``,
+    so category order never depends on which chunk or part came first.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        if not all(isinstance(f[col].dtype, pd.CategoricalDtype)
+                   for f in frames if col in f.columns):
+            continue
+        categories = union_categoricals(
+            [f[col] for f in frames if col in f.columns], sort_categories=True
+        ).categories
+        for f in frames:
+            if col in f.columns:
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_roster_csv(source, names=None, chunk_rows=ROSTER_CHUNK_ROWS):
+    """
+    Stream roster CSV data in chunks of ``chunk_rows``, keeping only
+    ROSTER_COLUMNS and cleaning and compacting each chunk before the next
+    one is parsed.
+
+    Only one raw chunk is held as object strings at a time, so peak memory
+    is roughly twice the compact result (chunks plus their concatenation)
+    plus about two raw chunks - around 150 MB with the default 100k-row
+    chunks - instead of several times the CSV size.
+    """
+    reader = pd.read_csv(
+        source,
+        header=None if names else 'infer',
+        names=names,
+        usecols=lambda col: col in ROSTER_COLUMNS,
+        chunksize=chunk_rows,
+    )
+    frames = []
+    chunks = iter(reader)
+    while True:
+        with instrument('roster read_csv') as record:
+            chunk = next(chunks, None)
+            record['rows_out'] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            break
+        with instrument('roster clean', rows_in=len(chunk)) as record:
+            frames.append(apply_schema(clean_roster_details(chunk), ROSTER_SCHEMA))
+    if not frames:
+        return pd.DataFrame(columns=[c for c in ROSTER_COLUMNS if not names or c in names])
+    return concat_compact(frames)
+
+
+def _load_roster_partition(path, months=None, ends=None):
+    """Cleaned frame for one roster CSV up to its length in ``ends`` (runs in a worker process)"""
+    return load_cached_frame(path, read_roster_csv, months, end=ends and ends[path])
+
+
+def _pool_context():
+    """
+    Start method for partition workers. This process runs other threads (the
+    refresh thread, script threads, the API server); a forked child would
+    inherit any lock one of them holds at that moment, with nothing left to
+    release it. Workers start from a fresh interpreter instead, so their
+    thread locks are their own and only the cache lock files are shared.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _init_partition_worker(cache_dir):
+    """Point a fresh worker process at this process's cache directory"""
+    global CACHE_DIR
+    CACHE_DIR = cache_dir
+
+
+def load_partitions(paths, load_fn, workers=ROSTER_WORKERS):
+    """
+    Run ``load_fn(path)`` for every partition, spread over a process pool
+    when there is more than one, and return the frames in ``paths`` order
+    """
+    workers = min(workers, len(paths))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                     initializer=_init_partition_worker,
+                                     initargs=(CACHE_DIR,)) as pool:
+                return list(pool.map(load_fn, paths))
+        except (BrokenProcessPool, pickle.PicklingError, AttributeError):
+            # No usable process pool here (e.g. the worker function cannot
+            # be re-imported) - fall back to loading in this process
+            pass
+    return [load_fn(p) for p in paths]
+
+
+def ingest_roster(path, months=None, version=None):
+    """
+    Parse, clean and combine every roster partition behind ``path``, as of
+    ``version`` when given (see ``source_ends``)
+    """
+    ends = source_ends(path, version)
+    paths = list(ends)
+    if not paths:
+        raise FileNotFoundError(f"no CSV files match {path}")
+    with instrument('ingest partitions', rows_in=len(paths)) as record:
+        frames = load_partitions(paths, partial(_load_roster_partition, months=months, ends=ends))
+        frames = [f for f in frames if not f.empty] or frames[:1]
+        df = concat_compact(frames)
+        record['rows_out'] = len(df)
+    return df
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def load_roster_processing_details(path=ROSTER_CSV, version=None, months=None):
+    """
+    Load and clean roster processing details from a CSV file, a directory of
+    partition CSVs or a glob. Partitions are parsed and cleaned in parallel,
+    each with its own Parquet cache, and combined with unified categories.
+
+    ``months`` (a tuple of 'YYYY-MM' keys of FILE_RECEIVED_DT) limits the
+    result to those months; once the cache is built only their Parquet
+    parts are read.
+
+    ``version`` is the cache key - pass ``source_version(path)`` so an
+    appended or rewritten file is picked up on the next rerun. Rows
+    appended after it are left out, so a rerun still on an older snapshot
+    never caches newer rows under the older key. The frame is
+    shared across reruns and sessions without copying, so treat it as
+    read-only. With ROSTER_DATA_PLANE set it is also shared across
+    processes through a memory-mapped Arrow file.
+    """
+    mark_cache_miss()
+    try:
+        if DATA_PLANE_DIR:
+            return shared_frame(
+                _plane_name('roster', path), version or source_version(path),
+                lambda: ingest_roster(path, version=version), split_by=month_keys, keys=months
+            )
+        return ingest_roster(path, months, version)
     except Exception as e:
-        st.error(f"Error loading roster_processing_details.csv: {e}")
+        st.error(f"Error loading {path}: {e}")
         return pd.DataFrame()
 
 
-@st.cache_data
-def load_aggregated_metrics():
+def normalize_months(values):
+    """
+    Parse MONTH values written as MM-YYYY or YYYY-MM (mixed within one file
+    is fine), parsing each distinct value once and mapping back by code.
+
+    Returns ``(labels, periods)``: a categorical of 'MM-YYYY' labels in
+    chronological order ('Unknown' where unparseable, last) and the matching
+    ``period[M]`` series (NaT where unparseable).
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Index(uniques, dtype=object).astype(str).str.strip()
+    parsed = pd.to_datetime(text, format='%m-%Y', errors='coerce')
+    for fmt in ['%Y-%m', 'mixed']:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed = parsed.where(~missing, pd.to_datetime(text, format=fmt, errors='coerce'))
+    
+    # Code -1 (missing MONTH) picks the NaT appended at the end
+    periods = parsed.to_period('M').append(pd.PeriodIndex([pd.NaT], freq='M'))
+    unique_labels = np.where(periods.isna(), 'Unknown', periods.strftime('%m-%Y'))
+    order = np.argsort(np.where(periods.isna(), np.iinfo('int64').max, periods.asi8),
+                       kind='stable')
+    categories = pd.unique(unique_labels[order])
+    label_codes = pd.Index(categories).get_indexer(unique_labels)
+    
+    labels = pd.Categorical.from_codes(label_codes[codes], categories=categories)
+    labels = labels.remove_unused_categories()
+    return (pd.Series(labels, index=values.index),
+            pd.Series(periods[codes], index=values.index))
+
+
+@st.cache_data(max_entries=CACHED_VERSIONS)
+def load_aggregated_metrics(path=METRICS_CSV, version=None):
     """Load and clean aggregated operational metrics CSV"""
+    mark_cache_miss()
     try:
-        df = pd.read_csv('aggregated_operational_metrics.csv')
+        with instrument('metrics read_csv') as record:
+            df = pd.read_csv(path)
+            record['rows_out'] = len(df)
         
         # Normalize MONTH format (handle MM-YYYY and YYYY-MM)
         if 'MONTH' in df.columns:
-            # Convert to datetime and then to standard format
-            df['MONTH_DT'] = pd.to_datetime(df['MONTH'], format='%m-%Y', errors='coerce')
-            if df['MONTH_DT'].isna().all():
-                df['MONTH_DT'] = pd.to_datetime(df['MONTH'], errors='coerce')
-            # Handle NaT values before strftime
-            df['MONTH'] = df['MONTH_DT'].apply(lambda x: x.strftime('%m-%Y') if pd.notna(x) else 'Unknown')
-            df['MONTH_SORT'] = df['MONTH_DT']
+            df['MONTH'], df['MONTH_SORT'] = normalize_months(df['MONTH'])
+            df['MONTH_DT'] = df['MONTH_SORT'].dt.to_timestamp()
         
         # Clean numeric columns
         numeric_cols = ['FIRST_ITER_SCS_CNT', 'FIRST_ITER_FAIL_CNT',
@@ -166,31 +1153,218 @@ def load_aggregated_metrics():
         if 'CLIENT_ID' in df.columns:
             df['CLIENT_ID'] = df['CLIENT_ID'].astype(str)
         
-        return df
+        return apply_schema(df, METRICS_SCHEMA)
     except Exception as e:
-        st.error(f"Error loading aggregated_operational_metrics.csv: {e}")
+        st.error(f"Error loading {path}: {e}")
         return pd.DataFrame()
 
 
 # ============================================================================
-# METRICS COMPUTATION
+# METRICS CUBE
 # ============================================================================
 
-def compute_kpis(agg_df, roster_df, selected_month=None):
-    """Compute key performance indicators"""
+CUBE_MEASURES = ['FIRST_ITER_SCS_CNT', 'FIRST_ITER_FAIL_CNT',
+                 'NEXT_ITER_SCS_CNT', 'NEXT_ITER_FAIL_CNT',
+                 'OVERALL_SCS_CNT', 'OVERALL_FAIL_CNT']
+
+
+class MetricsCube:
+    """
+    Pre-aggregated MONTH x MARKET x CLIENT_ID sums of the aggregated metrics.
+
+    Built once per data version. Month/market rollups are answered from a
+    dense month x market array of measure sums, so any filter combination
+    costs a few small numpy reductions instead of a scan of the raw rows.
+    """
+    
+    def __init__(self, agg_df):
+        dims = ['MONTH', 'MARKET', 'CLIENT_ID']
+        if agg_df.empty or not set(dims + CUBE_MEASURES) <= set(agg_df.columns):
+            agg_df = pd.DataFrame(columns=dims + ['MONTH_SORT'] + CUBE_MEASURES)
+        if 'MONTH_SORT' not in agg_df.columns:
+            agg_df = agg_df.assign(MONTH_SORT=pd.NaT)
+        
+        cells = (
+            agg_df.astype({m: 'int64' for m in CUBE_MEASURES})
+            .groupby(dims, observed=True, dropna=False)
+            .agg(MONTH_SORT=('MONTH_SORT', 'max'),
+                 **{m: (m, 'sum') for m in CUBE_MEASURES})
+            .reset_index()
+        )
+        
+        # Months in chronological order (unparseable months last),
+        # markets alphabetically
+        month_order = (cells.groupby('MONTH', dropna=False)['MONTH_SORT'].max()
+                       .sort_values(na_position='last'))
+        self.months = month_order.index.tolist()
+        self.month_sort = month_order.tolist()
+        self.markets = sorted(cells['MARKET'].astype(str).unique().tolist())
+        self._month_pos = {m: i for i, m in enumerate(self.months)}
+        self._market_pos = {m: i for i, m in enumerate(self.markets)}
+        
+        # Sparse cells keep the client dimension
+        self.cells = cells
+        self._cell_month = cells['MONTH'].map(self._month_pos).to_numpy(dtype='int64')
+        self._cell_market = cells['MARKET'].astype(str).map(self._market_pos).to_numpy(dtype='int64')
+        values = cells[CUBE_MEASURES].to_numpy(dtype='int64')
+        
+        # Dense month x market cuboid used by every rollup
+        shape = (len(self.months), len(self.markets))
+        self.totals = np.zeros(shape + (len(CUBE_MEASURES),), dtype='int64')
+        np.add.at(self.totals, (self._cell_month, self._cell_market), values)
+        self.present = np.zeros(shape, dtype=bool)
+        self.present[self._cell_month, self._cell_market] = True
+    
+    @property
+    def empty(self):
+        return not self.present.any()
+    
+    def _select(self, month=None, market=None):
+        """Month and market index selections for the dense cuboid"""
+        months = slice(None) if month is None else [self._month_pos.get(month, -1)]
+        markets = slice(None) if market is None else [self._market_pos.get(market, -1)]
+        if months != slice(None) and months[0] < 0:
+            months = []
+        if markets != slice(None) and markets[0] < 0:
+            markets = []
+        return months, markets
+    
+    def latest_month(self, market=None):
+        """Most recent parseable month with data for ``market`` (or any market)"""
+        _, markets = self._select(market=market)
+        has_data = self.present[:, markets].any(axis=1)
+        for i in range(len(self.months) - 1, -1, -1):
+            if has_data[i] and pd.notna(self.month_sort[i]):
+                return self.months[i]
+        return None
     
-    # Filter by month if specified
-    if selected_month and not agg_df.empty:
-        agg_filtered = agg_df[agg_df['MONTH'] == selected_month]
-    else:
-        # Use latest month
-        if not agg_df.empty and 'MONTH_SORT' in agg_df.columns:
-            latest_month = agg_df['MONTH_SORT'].max()
-            agg_filtered = agg_df[agg_df['MONTH_SORT'] == latest_month]
+    def rollup(self, month=None, market=None, by=None):
+        """
+        Sum the measures for a month/market filter.
+
+        With ``by=None`` returns a dict of measure totals (or None when no
+        cell matches); with ``by='MONTH'`` or ``by='MARKET'`` returns a frame
+        with one row per member that has data.
+        """
+        months, markets = self._select(month, market)
+        block = self.totals[months][:, markets]
+        present = self.present[months][:, markets]
+        
+        if by is None:
+            if not present.any():
+                return None
+            return dict(zip(CUBE_MEASURES, block.sum(axis=(0, 1)).tolist()))
+        
+        if by == 'MONTH':
+            sums, has_data = block.sum(axis=1), present.any(axis=1)
+            labels = np.array(self.months, dtype=object)[months]
+            result = pd.DataFrame(sums, columns=CUBE_MEASURES)
+            result.insert(0, 'MONTH_SORT', np.array(self.month_sort, dtype=object)[months])
+            result.insert(0, 'MONTH', labels)
+            result['MONTH_SORT'] = result['MONTH_SORT'].astype('period[M]')
+        elif by == 'MARKET':
+            sums, has_data = block.sum(axis=0), present.any(axis=0)
+            result = pd.DataFrame(sums, columns=CUBE_MEASURES)
+            result.insert(0, 'MARKET', np.array(self.markets, dtype=object)[markets])
         else:
-            agg_filtered = agg_df
-    
-    if agg_filtered.empty:
+            raise ValueError(f"Unsupported rollup dimension: {by}")
+        
+        return result[has_data].reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def load_metrics_cube(path=METRICS_CSV, version=None):
+    """Metrics cube for the aggregated metrics file, built once per version"""
+    mark_cache_miss()
+    agg_df = load_aggregated_metrics(path, version)
+    with instrument('build metrics cube', rows_in=len(agg_df)):
+        return MetricsCube(agg_df)
+
+
+# ============================================================================
+# FILTER INDEX
+# ============================================================================
+
+# Roster columns the sidebar and drill-downs filter on
+ROSTER_INDEX_COLUMNS = ['CNT_STATE', 'LOB', 'ORG_NM']
+
+
+class FilterIndex:
+    """
+    Value -> row-position index over a frame's filter columns.
+
+    Each column is stored as a stable argsort of its category codes plus
+    per-value slice offsets, so a filter is a slice lookup (and an
+    intersection when several columns are filtered) rather than a boolean
+    scan of every row. The distinct values are precomputed for option lists.
+    """
+    
+    def __init__(self, df, columns):
+        self.frame = df
+        self._values = {}
+        self._order = {}
+        self._offsets = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            self._values[col] = {v: i for i, v in enumerate(uniques.tolist())}
+            self._order[col] = np.argsort(codes, kind='stable')[(codes < 0).sum():]
+            self._offsets[col] = np.concatenate([[0], np.cumsum(counts)])
+    
+    def options(self, col):
+        """Sorted distinct values of ``col`` (empty if not indexed)"""
+        return list(self._values.get(col, {}))
+    
+    def positions(self, col, value):
+        """Ascending row positions where ``col == value``"""
+        i = self._values[col].get(value)
+        if i is None:
+            return np.empty(0, dtype='int64')
+        return self._order[col][self._offsets[col][i]:self._offsets[col][i + 1]]
+    
+    def select(self, **filters):
+        """
+        Rows matching every ``column=value`` filter; ``None`` values are
+        ignored. Returns the indexed frame itself when nothing is filtered.
+        """
+        active = [(col, value) for col, value in filters.items() if value is not None]
+        if not active:
+            return self.frame
+        rows = None
+        for col, value in active:
+            matched = self.positions(col, value)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return self.frame.take(rows)
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def load_roster_index(path=ROSTER_CSV, version=None, months=None):
+    """Filter index over the cleaned roster table, built once per version and month window"""
+    mark_cache_miss()
+    roster_df = load_roster_processing_details(path, version, months)
+    with instrument('build filter index', rows_in=len(roster_df)):
+        return FilterIndex(roster_df, ROSTER_INDEX_COLUMNS)
+
+
+# ============================================================================
+# METRICS COMPUTATION
+# ============================================================================
+
+def compute_kpis(cube, roster_df=None, selected_month=None, selected_market=None,
+                 distinct=None):
+    """
+    Compute key performance indicators from the metrics cube. The
+    organization count comes from ``distinct`` (a ``count_distinct``
+    result) when given, else exactly from ``roster_df``; both may be None.
+    """
+    
+    # Use the latest month unless one is selected
+    month = selected_month or cube.latest_month(selected_market)
+    totals = cube.rollup(month=month, market=selected_market) if month else None
+    
+    if totals is None:
         return {
             'total_transactions': 0,
             'success_rate': 0.0,
@@ -200,17 +1374,22 @@ def compute_kpis(agg_df, roster_df, selected_month=None):
             'total_organizations': 0
         }
     
-    total_transactions = int(agg_filtered['OVERALL_SCS_CNT'].sum() + agg_filtered['OVERALL_FAIL_CNT'].sum())
-    total_failures = int(agg_filtered['OVERALL_FAIL_CNT'].sum())
-    total_success = int(agg_filtered['OVERALL_SCS_CNT'].sum())
+    total_success = totals['OVERALL_SCS_CNT']
+    total_failures = totals['OVERALL_FAIL_CNT']
+    total_transactions = total_success + total_failures
     success_rate = (total_success / total_transactions * 100) if total_transactions > 0 else 0.0
     
-    first_iter_success = int(agg_filtered['FIRST_ITER_SCS_CNT'].sum())
-    next_iter_success = int(agg_filtered['NEXT_ITER_SCS_CNT'].sum())
+    first_iter_success = totals['FIRST_ITER_SCS_CNT']
+    next_iter_success = totals['NEXT_ITER_SCS_CNT']
     reprocess_recovery = next_iter_success - first_iter_success
     
-    # Organization count from roster details
-    total_organizations = roster_df['ORG_NM'].nunique() if not roster_df.empty else 0
+    # Organization count from the distinct-value sketches or roster details
+    if distinct is not None:
+        total_organizations = distinct['ORG_NM'][0]
+    elif roster_df is not None and not roster_df.empty:
+        total_organizations = roster_df['ORG_NM'].nunique()
+    else:
+        total_organizations = 0
     
     return {
         'total_transactions': total_transactions,
@@ -226,23 +1405,52 @@ def compute_kpis(agg_df, roster_df, selected_month=None):
 # VISUALIZATION FUNCTIONS
 # ============================================================================
 
-def create_monthly_trend(agg_df):
-    """Monthly success rate trend line chart"""
-    if agg_df.empty or 'MONTH_SORT' not in agg_df.columns:
-        return None
-    
-    # Aggregate by month
-    monthly = agg_df.groupby(['MONTH', 'MONTH_SORT']).agg({
-        'OVERALL_SCS_CNT': 'sum',
-        'OVERALL_FAIL_CNT': 'sum'
-    }).reset_index()
+def monthly_success_rates(cube, selected_market=None):
+    """Overall success rate per parseable month, oldest first"""
+    monthly = cube.rollup(market=selected_market, by='MONTH')
+    monthly = monthly[monthly['MONTH_SORT'].notna()]
     
     monthly['Success_Rate'] = (
         monthly['OVERALL_SCS_CNT'] / 
         (monthly['OVERALL_SCS_CNT'] + monthly['OVERALL_FAIL_CNT']) * 100
     )
+    return monthly
+
+
+def iteration_breakdown(cube, selected_market=None, top_n=10):
+    """
+    First-iteration successes and reprocessing recovery for the largest
+    ``top_n`` markets in the latest month, or None without data
+    """
+    latest_month = cube.latest_month(selected_market)
+    if latest_month is None:
+        return None
+    
+    df_latest = cube.rollup(month=latest_month, market=selected_market, by='MARKET')
+    
+    # Select top markets by total volume
+    df_latest['Total_Volume'] = df_latest['OVERALL_SCS_CNT'] + df_latest['OVERALL_FAIL_CNT']
+    top_markets = df_latest.nlargest(top_n, 'Total_Volume')
+    top_markets['Recovery'] = top_markets['NEXT_ITER_SCS_CNT'] - top_markets['FIRST_ITER_SCS_CNT']
+    top_markets.insert(0, 'MONTH', latest_month)
+    return top_markets
+
+
+def stage_distribution(roster_df):
+    """Rosters per latest processing stage, largest first, tail folded into 'Other'"""
+    stage_counts = roster_df['LATEST_STAGE_NM'].value_counts()
+    stage_counts = stage_counts[stage_counts > 0]
+    stage_counts = top_n_with_other(stage_counts, STAGE_CHART_TOP_N).reset_index()
+    stage_counts.columns = ['Stage', 'Count']
+    return stage_counts
+
+
+def create_monthly_trend(cube, selected_market=None):
+    """Monthly success rate trend line chart"""
+    if cube.empty:
+        return None
     
-    monthly = monthly.sort_values('MONTH_SORT')
+    monthly = monthly_success_rates(cube, selected_market)
     
     fig = px.line(
         monthly, 
@@ -264,19 +1472,12 @@ def create_monthly_trend(agg_df):
     return fig
 
 
-def create_first_vs_next_iter(agg_df):
+def create_first_vs_next_iter(cube, selected_market=None):
     """Stacked bar chart comparing first vs next iteration success by market"""
-    if agg_df.empty:
+    top_markets = iteration_breakdown(cube, selected_market)
+    if top_markets is None:
         return None
     
-    # Get latest month
-    latest_month = agg_df['MONTH_SORT'].max()
-    df_latest = agg_df[agg_df['MONTH_SORT'] == latest_month].copy()
-    
-    # Select top 10 markets by total volume
-    df_latest['Total_Volume'] = df_latest['OVERALL_SCS_CNT'] + df_latest['OVERALL_FAIL_CNT']
-    top_markets = df_latest.nlargest(10, 'Total_Volume')
-    
     fig = go.Figure()
     
     fig.add_trace(go.Bar(
@@ -289,7 +1490,7 @@ def create_first_vs_next_iter(agg_df):
     fig.add_trace(go.Bar(
         name='Recovery (Next Iterations)',
         x=top_markets['MARKET'],
-        y=top_markets['NEXT_ITER_SCS_CNT'] - top_markets['FIRST_ITER_SCS_CNT'],
+        y=top_markets['Recovery'],
         marker_color='#3498db'
     ))
     
@@ -305,21 +1506,60 @@ def create_first_vs_next_iter(agg_df):
     return fig
 
 
-def create_top_failures_chart(roster_df, group_by='CNT_STATE', top_n=10):
-    """Bar chart showing top failures by organization, state, or LOB"""
-    if roster_df.empty or group_by not in roster_df.columns:
-        return None
-    
-    # Filter for failed rosters (IS_FAILED = 1)
-    failed_rosters = roster_df[roster_df['IS_FAILED'] == 1]
-    
-    if failed_rosters.empty:
+# Dimensions shown in the failure tabs, ranked together in one pass
+FAILURE_DIMENSIONS = ['CNT_STATE', 'ORG_NM', 'LOB']
+
+
+def rank_failures(roster_df, dimensions=FAILURE_DIMENSIONS, top_n=10):
+    """
+    Top ``top_n`` failure counts for each of ``dimensions``.
+
+    The IS_FAILED mask is computed once and shared by every dimension; each
+    one is counted with np.bincount over its category codes and ranked with
+    np.argpartition, so only the ``top_n`` winners are ever sorted. Returns
+    ``{dimension: frame of [dimension, 'Failure Count']}`` with dimensions
+    that have no failures left out.
+    """
+    if roster_df.empty or 'IS_FAILED' not in roster_df.columns:
+        return {}
+    failed = roster_df['IS_FAILED'].to_numpy() == 1
+    if not failed.any():
+        return {}
+    
+    ranking = {}
+    for col in dimensions:
+        if col not in roster_df.columns:
+            continue
+        values = roster_df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, labels = values.cat.codes.to_numpy()[failed], values.cat.categories
+        else:
+            codes, labels = pd.factorize(values[failed], sort=True)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        k = min(top_n, np.count_nonzero(counts))
+        if k == 0:
+            continue
+        top = np.argpartition(-counts, k - 1)[:k]
+        # Highest count first, ties in label order
+        top = top[np.lexsort((top, -counts[top]))]
+        ranking[col] = pd.DataFrame({
+            col: np.asarray(labels, dtype=object)[top],
+            'Failure Count': counts[top],
+        })
+    return ranking
+
+
+def create_top_failures_chart(roster_df, group_by='CNT_STATE', top_n=10, ranking=None):
+    """
+    Bar chart showing top failures by organization, state, or LOB. Pass the
+    ``rank_failures`` result as ``ranking`` to reuse counts across tabs.
+    """
+    if ranking is None:
+        ranking = rank_failures(roster_df, [group_by], top_n)
+    failures = ranking.get(group_by)
+    if failures is None:
         return None
     
-    # Count failures by group
-    failures = failed_rosters.groupby(group_by).size().reset_index(name='Failure Count')
-    failures = failures.sort_values('Failure Count', ascending=False).head(top_n)
-    
     fig = px.bar(
         failures,
         x=group_by,
@@ -340,38 +1580,22 @@ def create_top_failures_chart(roster_df, group_by='CNT_STATE', top_n=10):
 
 
 def create_failure_details_table(roster_df, limit=50):
-    """Create a detailed table of failed roster runs"""
-    if roster_df.empty:
-        return pd.DataFrame()
-    
-    # Filter for failures (IS_FAILED = 1)
-    failures = roster_df[roster_df['IS_FAILED'] == 1].copy()
-    
-    if failures.empty:
-        return pd.DataFrame()
-    
-    # Sort by recent date
-    failures = failures.sort_values('LAST_UPDT_DT', ascending=False)
-    
-    # Select relevant columns
-    display_cols = ['RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'RUN_NO', 
-                   'FAILURE_STATUS', 'LATEST_STAGE_NM', 'SPS_LOAD_HEALTH',
-                   'IS_STUCK', 'LATEST_OBJECT_RUN_DT']
-    
-    available_cols = [col for col in display_cols if col in failures.columns]
-    
-    return failures[available_cols].head(limit)
+    """Create a detailed table of the most recently updated failed roster runs"""
+    return failure_page(roster_df, failure_order(roster_df), 0, limit)
 
 
-def create_processing_stage_chart(roster_df):
-    """Bar chart showing processing stage distribution"""
-    if roster_df.empty or 'LATEST_STAGE_NM' not in roster_df.columns:
+def create_processing_stage_chart(roster_df, stage_counts=None):
+    """
+    Bar chart showing processing stage distribution. Pass precomputed
+    ``stage_counts`` (e.g. from ``SqliteRoster``) to skip the frame.
+    """
+    if stage_counts is None:
+        if roster_df.empty or 'LATEST_STAGE_NM' not in roster_df.columns:
+            return None
+        stage_counts = stage_distribution(roster_df)
+    if stage_counts.empty:
         return None
     
-    # Count rosters by stage
-    stage_counts = roster_df['LATEST_STAGE_NM'].value_counts().reset_index()
-    stage_counts.columns = ['Stage', 'Count']
-    
     fig = px.bar(
         stage_counts,
         x='Stage',
@@ -391,41 +1615,870 @@ def create_processing_stage_chart(roster_df):
     return fig
 
 
-def create_duration_analysis(roster_df):
-    """Box plot showing processing duration distribution by stage"""
-    if roster_df.empty:
+# Maximum data points a single figure may ship to the browser
+FIGURE_POINT_BUDGET = 10_000
+# Stages shown individually in the stage chart; the rest are bucketed as 'Other'
+STAGE_CHART_TOP_N = 20
+# Neutral color of the 'Other' bar, which stands for many categories
+OTHER_BAR_COLOR = '#95a5a6'
+
+# Duration columns and their display labels, in pipeline order
+DURATION_STAGES = {
+    'PRE_PROCESSING_DURATION': 'Pre-Processing',
+    'ISF_GEN_DURATION': 'ISF Generation',
+    'DART_GEN_DURATION': 'DART Generation',
+    'SPS_LOAD_DURATION': 'SPS Load'
+}
+
+
+def duration_quantiles(roster_df):
+    """Per-stage box statistics of positive durations: min, Q1, median, Q3, max and Tukey whiskers"""
+    rows = []
+    for col, label in DURATION_STAGES.items():
+        if col not in roster_df.columns:
+            continue
+        values = roster_df[col].to_numpy()
+        values = values[values > 0]
+        if len(values) == 0:
+            continue
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        rows.append({
+            'Stage': label,
+            'count': len(values),
+            'min': values.min(),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'max': values.max(),
+            'lower_whisker': values[values >= q1 - 1.5 * iqr].min(),
+            'upper_whisker': values[values <= q3 + 1.5 * iqr].max(),
+        })
+    return pd.DataFrame(rows)
+
+
+def create_duration_analysis(roster_df, summary=False, stats=None):
+    """
+    Box plot showing processing duration distribution by stage.
+
+    With ``summary=True`` the boxes are drawn from precomputed quantiles, so
+    the figure size no longer depends on the number of rows (outlier points
+    are not shown). Passing ``stats`` (a ``duration_quantiles`` result, e.g.
+    from SQLite) draws that summary without ``roster_df``.
+    """
+    if stats is not None:
+        summary = True
+    elif roster_df.empty:
         return None
     
-    # Prepare duration data
-    duration_cols = {
-        'PRE_PROCESSING_DURATION': 'Pre-Processing',
-        'ISF_GEN_DURATION': 'ISF Generation',
-        'DART_GEN_DURATION': 'DART Generation',
-        'SPS_LOAD_DURATION': 'SPS Load'
-    }
-    
-    duration_data = []
-    for col, label in duration_cols.items():
-        if col in roster_df.columns:
-            valid_durations = roster_df[roster_df[col] > 0][col]
-            for duration in valid_durations:
-                duration_data.append({'Stage': label, 'Duration (min)': duration})
-    
-    if not duration_data:
-        return None
+    if summary:
+        if stats is None:
+            stats = duration_quantiles(roster_df)
+        if stats.empty:
+            return None
+        
+        fig = go.Figure()
+        for row in stats.itertuples(index=False):
+            fig.add_trace(go.Box(
+                name=row.Stage,
+                x=[row.Stage],
+                q1=[row.q1],
+                median=[row.median],
+                q3=[row.q3],
+                lowerfence=[row.lower_whisker],
+                upperfence=[row.upper_whisker]
+            ))
+        fig.update_layout(
+            title='Processing Duration Distribution by Stage',
+            xaxis_title='Stage',
+            yaxis_title='Duration (min)'
+        )
+    else:
+        # Long format: one row per positive duration
+        cols = [col for col in DURATION_STAGES if col in roster_df.columns]
+        if not cols:
+            return None
+        df_duration = (
+            roster_df[cols]
+            .rename(columns=DURATION_STAGES)
+            .melt(var_name='Stage', value_name='Duration (min)')
+        )
+        df_duration = df_duration[df_duration['Duration (min)'] > 0]
+        
+        if df_duration.empty:
+            return None
+        
+        fig = px.box(
+            df_duration,
+            x='Stage',
+            y='Duration (min)',
+            title='Processing Duration Distribution by Stage',
+            color='Stage'
+        )
     
-    df_duration = pd.DataFrame(duration_data)
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        height=400,
+        showlegend=False
+    )
     
-    fig = px.box(
-        df_duration,
-        x='Stage',
-        y='Duration (min)',
-        title='Processing Duration Distribution by Stage',
-        color='Stage'
+    return fig
+
+
+# ============================================================================
+# FAILURE DETAILS
+# ============================================================================
+
+FAILURE_DETAIL_COLUMNS = ['RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'RUN_NO',
+                          'FAILURE_STATUS', 'LATEST_STAGE_NM', 'SPS_LOAD_HEALTH',
+                          'IS_STUCK', 'LATEST_OBJECT_RUN_DT']
+# Columns the details table can be sorted on, with their labels
+FAILURE_SORT_COLUMNS = {
+    'LAST_UPDT_DT': 'Last updated',
+    'LATEST_OBJECT_RUN_DT': 'Latest run',
+    'RUN_NO': 'Run number',
+    'ORG_NM': 'Organization',
+    'CNT_STATE': 'State',
+}
+FAILURE_PAGE_SIZES = [25, 50, 100, 250]
+# Rows converted per step when exporting the failed rosters
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def failure_order(roster_df, sort_by='LAST_UPDT_DT', ascending=False, statuses=None):
+    """
+    Row positions of the failed rosters (optionally only those whose
+    FAILURE_STATUS is in ``statuses``) in display order. Only the failed
+    subset's sort key is sorted, and the result is small enough to cache
+    per filter state so paging is a slice.
+    """
+    if roster_df.empty or 'IS_FAILED' not in roster_df.columns:
+        return np.empty(0, dtype='int64')
+    failed = roster_df['IS_FAILED'].to_numpy() == 1
+    if statuses:
+        failed &= roster_df['FAILURE_STATUS'].isin(statuses).to_numpy()
+    positions = np.flatnonzero(failed)
+    if sort_by not in roster_df.columns or len(positions) == 0:
+        return positions
+    keys = roster_df[sort_by].take(positions).reset_index(drop=True)
+    order = keys.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    return positions[order.to_numpy()]
+
+
+def failure_statuses(roster_df):
+    """Distinct FAILURE_STATUS values among the failed rosters"""
+    if roster_df.empty or 'FAILURE_STATUS' not in roster_df.columns:
+        return []
+    failed = roster_df['IS_FAILED'].to_numpy() == 1
+    return sorted(roster_df['FAILURE_STATUS'][failed].astype(str).unique().tolist())
+
+
+def _detail_rows(roster_df, positions):
+    """Detail columns of the rows at ``positions``; rows are taken first so only they are copied"""
+    return roster_df.take(positions)[[col for col in FAILURE_DETAIL_COLUMNS
+                                      if col in roster_df.columns]]
+
+
+def failure_page(roster_df, order, page, page_size):
+    """Detail columns for rows ``order[page * page_size:(page + 1) * page_size]``"""
+    if len(order) == 0:
+        return pd.DataFrame()
+    return _detail_rows(roster_df, order[page * page_size:(page + 1) * page_size])
+
+
+def failure_chunks(roster_df, order, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Detail columns for every row in ``order``, ``chunk_rows`` at a time (one empty frame if none)"""
+    if len(order) == 0:
+        yield _detail_rows(roster_df, order)
+    for start in range(0, len(order), chunk_rows):
+        yield _detail_rows(roster_df, order[start:start + chunk_rows])
+
+
+def write_failures_csv(chunks, out):
+    """
+    Write the frames from ``chunks`` as one CSV to the binary file object
+    ``out``, a chunk at a time, so the full export is never one string
+    """
+    header = True
+    for chunk in chunks:
+        out.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+
+def write_failures_parquet(chunks, out):
+    """Write the frames from ``chunks`` to ``out`` as Parquet, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+
+# Row batch size for bulk inserts while building a table
+SQLITE_INSERT_ROWS = 50_000
+# Indexes on each table; the composite one serves the month + state filter
+# every roster view starts from
+SQLITE_INDEXES = {
+    'roster': [['CNT_STATE'], ['ORG_NM'], ['LOB'], ['MONTH'], ['IS_FAILED'],
+               ['MONTH', 'CNT_STATE', 'IS_FAILED']],
+    'metrics': [['MONTH', 'MARKET'], ['MARKET']],
+}
+
+
+def _sqlite_path(kind, path, version):
+    """Database file for one version of a source; a new version gets a new file"""
+    digest = hashlib.blake2b(json.dumps([CACHE_FORMAT_VERSION, version]).encode(),
+                             digest_size=8).hexdigest()
+    return os.path.join(CACHE_DIR, f'{_plane_name(kind, path)}-{digest}.sqlite')
+
+
+# A superseded database is kept this long after its replacement was built,
+# so snapshots still on the old version (in this process until the swap, or
+# in other server processes until their next refresh) keep working
+SQLITE_RETAIN_SECONDS = 600
+
+
+def build_sqlite_table(db_path, table, frames):
+    """
+    Write ``frames`` (an iterable of DataFrames) into ``table`` of a new
+    database at ``db_path`` and index it. The file is built under a unique
+    temporary name while holding the database's cache lock and renamed into
+    place, so readers never see a partial table and concurrent builders
+    never touch each other's files. Returns the number of rows written, or
+    None when another builder created the database first.
+    """
+    directory, name = os.path.split(db_path)
+    os.makedirs(directory, exist_ok=True)
+    with _cache_lock(db_path):
+        if os.path.exists(db_path):
+            return None
+        # Leftovers of builds that crashed (or lost a stale lock)
+        for old in os.listdir(directory):
+            old_path = os.path.join(directory, old)
+            try:
+                if (old.startswith(name + '.') and old.endswith('.tmp')
+                        and time.time() - os.path.getmtime(old_path) > LOCK_TIMEOUT):
+                    os.remove(old_path)
+            except OSError:
+                pass
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.tmp')
+        os.close(fd)
+        try:
+            rows = 0
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                # A crash just leaves a .tmp file to rebuild, so skip the journal
+                conn.execute('PRAGMA journal_mode = OFF')
+                conn.execute('PRAGMA synchronous = OFF')
+                for df in frames:
+                    df.to_sql(table, conn, if_exists='append', index=False,
+                              chunksize=SQLITE_INSERT_ROWS)
+                    rows += len(df)
+                for i, cols in enumerate(SQLITE_INDEXES[table]):
+                    conn.execute(f'CREATE INDEX idx_{table}_{i} ON {table} '
+                                 f'({", ".join(cols)})')
+                conn.execute('ANALYZE')
+                conn.commit()
+            os.replace(tmp_path, db_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    remove_superseded_sqlite(db_path)
+    return rows
+
+
+def remove_superseded_sqlite(db_path):
+    """
+    Remove the databases for the same source as ``db_path`` whose
+    replacement was built more than SQLITE_RETAIN_SECONDS ago
+    """
+    directory, name = os.path.split(db_path)
+    prefix = name.rsplit('-', 1)[0] + '-'
+    try:
+        built = sorted((os.path.getmtime(os.path.join(directory, other)), other)
+                       for other in os.listdir(directory)
+                       if other.startswith(prefix) and other.endswith('.sqlite'))
+    except OSError:
+        return
+    cutoff = time.time() - SQLITE_RETAIN_SECONDS
+    # Each database was superseded when the next newer one was built
+    for (_, old), (replaced, _) in zip(built, built[1:]):
+        if replaced < cutoff:
+            try:
+                os.remove(os.path.join(directory, old))
+            except OSError:
+                pass
+
+
+def _sqlite_where(**filters):
+    """
+    WHERE clause and parameters for ``column=value`` filters: None is
+    ignored, a tuple or list becomes an IN list
+    """
+    clauses, params = [], []
+    for col, value in filters.items():
+        if value is None:
+            continue
+        if isinstance(value, (tuple, list)):
+            clauses.append(f'{col} IN ({", ".join("?" * len(value))})')
+            params.extend(value)
+        else:
+            clauses.append(f'{col} = ?')
+            params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def _sqlite_frames(db_path, sql, params=(), chunk_rows=None):
+    """Yield the result of a read-only query as DataFrames of ``chunk_rows`` rows"""
+    with closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as conn:
+        chunks = pd.read_sql_query(sql, conn, params=params, chunksize=chunk_rows)
+        for df in [chunks] if chunk_rows is None else chunks:
+            # Timestamps are stored as ISO text
+            for col in df.columns:
+                if col.endswith('_DT'):
+                    df[col] = pd.to_datetime(df[col], format='ISO8601', errors='coerce')
+            yield df
+
+
+def _sqlite_query(db_path, sql, params=()):
+    """Result of a read-only query as one DataFrame"""
+    with instrument('sqlite query') as record:
+        df = next(_sqlite_frames(db_path, sql, params))
+        record['rows_out'] = len(df)
+    return df
+
+
+def _roster_frames(path, version=None):
+    """
+    Cleaned roster frames for every partition behind ``path``, one cached
+    Parquet part at a time, so building the database never holds the whole
+    table in memory
+    """
+    for _, load in cached_parts(path, read_roster_csv, version):
+        df = load()
+        yield df.assign(MONTH=month_keys(df))
+
+
+class SqliteMetrics:
+    """
+    The MetricsCube interface (months, markets, empty, latest_month,
+    rollup) answered by GROUP BY queries on the metrics table, so
+    compute_kpis and the trend charts run on it unchanged.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        months = _sqlite_query(
+            db_path,
+            'SELECT MONTH, MAX(MONTH_SORT) AS MONTH_SORT FROM metrics '
+            'GROUP BY MONTH ORDER BY MONTH_SORT IS NULL, MONTH_SORT'
+        )
+        self.months = months['MONTH'].tolist()
+        self.markets = _sqlite_query(
+            db_path, 'SELECT DISTINCT MARKET FROM metrics ORDER BY MARKET'
+        )['MARKET'].tolist()
+    
+    @property
+    def empty(self):
+        return not self.months
+    
+    def latest_month(self, market=None):
+        """Most recent parseable month with data for ``market`` (or any market)"""
+        where, params = _sqlite_where(MARKET=market)
+        where += (' AND' if where else ' WHERE') + ' MONTH_SORT IS NOT NULL'
+        latest = _sqlite_query(
+            self.db_path,
+            f'SELECT MONTH FROM metrics{where} ORDER BY MONTH_SORT DESC LIMIT 1', params
+        )
+        return latest['MONTH'].iloc[0] if len(latest) else None
+    
+    def rollup(self, month=None, market=None, by=None):
+        """Same results as ``MetricsCube.rollup``, computed by the database"""
+        sums = ', '.join(f'SUM({m}) AS {m}' for m in CUBE_MEASURES)
+        where, params = _sqlite_where(MONTH=month, MARKET=market)
+        
+        if by is None:
+            totals = _sqlite_query(self.db_path,
+                                   f'SELECT COUNT(*) AS n, {sums} FROM metrics{where}', params)
+            if totals['n'].iloc[0] == 0:
+                return None
+            return {m: int(totals[m].iloc[0]) for m in CUBE_MEASURES}
+        
+        if by == 'MONTH':
+            result = _sqlite_query(
+                self.db_path,
+                f'SELECT MONTH, MAX(MONTH_SORT) AS MONTH_SORT, {sums} FROM metrics{where} '
+                'GROUP BY MONTH ORDER BY MAX(MONTH_SORT) IS NULL, MAX(MONTH_SORT)', params
+            )
+            result['MONTH_SORT'] = (pd.to_datetime(result['MONTH_SORT'], format='%Y-%m')
+                                    .dt.to_period('M'))
+        elif by == 'MARKET':
+            result = _sqlite_query(
+                self.db_path,
+                f'SELECT MARKET, {sums} FROM metrics{where} GROUP BY MARKET ORDER BY MARKET',
+                params
+            )
+        else:
+            raise ValueError(f"Unsupported rollup dimension: {by}")
+        return result.astype({m: 'int64' for m in CUBE_MEASURES})
+
+
+class SqliteRoster:
+    """
+    Roster views as queries on the indexed roster table. Every method takes
+    the dashboard filters ``months`` (a tuple of 'YYYY-MM' keys or None) and
+    ``state`` (a CNT_STATE or None), so only matching rows are ever read
+    and only aggregates or one page come back into memory.
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+    
+    def _query(self, sql, params=()):
+        return _sqlite_query(self.db_path, sql, params)
+    
+    def options(self, col, months=None):
+        """Sorted distinct values of a filter column"""
+        if col not in ROSTER_INDEX_COLUMNS:
+            raise ValueError(f"Not a filter column: {col}")
+        where, params = _sqlite_where(MONTH=months)
+        return self._query(f'SELECT DISTINCT {col} FROM roster{where} ORDER BY {col}',
+                           params)[col].tolist()
+    
+    def count(self, months=None, state=None):
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state)
+        return int(self._query(f'SELECT COUNT(*) AS n FROM roster{where}', params)['n'].iloc[0])
+    
+    def stage_distribution(self, months=None, state=None):
+        """Same result as ``stage_distribution`` on the filtered frame"""
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state)
+        counts = self._query(
+            f'SELECT LATEST_STAGE_NM, COUNT(*) AS n FROM roster{where} '
+            'GROUP BY LATEST_STAGE_NM ORDER BY n DESC, LATEST_STAGE_NM', params
+        )
+        counts = pd.Series(counts['n'].to_numpy(), index=counts['LATEST_STAGE_NM'])
+        stage_counts = top_n_with_other(counts, STAGE_CHART_TOP_N).reset_index()
+        stage_counts.columns = ['Stage', 'Count']
+        return stage_counts
+    
+    def durations(self, months=None, state=None):
+        """
+        Duration columns of the filtered rows, for the raw-point duration
+        chart (only drawn while the rows fit FIGURE_POINT_BUDGET)
+        """
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state)
+        return self._query(f'SELECT {", ".join(DURATION_STAGES)} FROM roster{where}', params)
+    
+    def duration_quantiles(self, months=None, state=None):
+        """
+        Same result as ``duration_quantiles`` on the filtered frame, computed
+        in SQL so no duration rows are fetched: per stage one aggregate
+        query, one ordered query returning only the rows at the quartile
+        ranks, and one for the whiskers
+        """
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state)
+        rows = []
+        for col, label in DURATION_STAGES.items():
+            positive = f'{where} AND {col} > 0' if where else f' WHERE {col} > 0'
+            totals = self._query(f'SELECT COUNT(*) AS n, MIN({col}) AS low, MAX({col}) AS high '
+                                 f'FROM roster{positive}', params).iloc[0]
+            count = int(totals['n'])
+            if count == 0:
+                continue
+            # np.quantile's default: interpolate between the values at the
+            # 0-based ranks either side of (count - 1) * q
+            positions = [(count - 1) * q for q in (0.25, 0.5, 0.75)]
+            bounds = [(int(p), min(int(p) + 1, count - 1)) for p in positions]
+            ranks = sorted({rank for pair in bounds for rank in pair})
+            ordered = self._query(
+                f'SELECT rank, value FROM (SELECT {col} AS value, '
+                f'ROW_NUMBER() OVER (ORDER BY {col}) - 1 AS rank FROM roster{positive}) '
+                f'WHERE rank IN ({", ".join("?" * len(ranks))})', params + ranks
+            )
+            at = dict(zip(ordered['rank'], ordered['value']))
+            q1, median, q3 = [at[lo] + (p - lo) * (at[hi] - at[lo])
+                              for p, (lo, hi) in zip(positions, bounds)]
+            iqr = q3 - q1
+            whiskers = self._query(
+                f'SELECT MIN(CASE WHEN {col} >= ? THEN {col} END) AS lower, '
+                f'MAX(CASE WHEN {col} <= ? THEN {col} END) AS upper FROM roster{positive}',
+                [q1 - 1.5 * iqr, q3 + 1.5 * iqr] + params
+            ).iloc[0]
+            rows.append({
+                'Stage': label,
+                'count': count,
+                'min': totals['low'],
+                'q1': q1,
+                'median': median,
+                'q3': q3,
+                'max': totals['high'],
+                'lower_whisker': whiskers['lower'],
+                'upper_whisker': whiskers['upper'],
+            })
+        return pd.DataFrame(rows)
+    
+    def rank_failures(self, dimensions=FAILURE_DIMENSIONS, top_n=10, months=None, state=None):
+        """Same result as ``rank_failures`` on the filtered frame"""
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state, IS_FAILED=1)
+        ranking = {}
+        for col in dimensions:
+            failures = self._query(
+                f'SELECT {col}, COUNT(*) AS "Failure Count" FROM roster{where} '
+                f'GROUP BY {col} ORDER BY "Failure Count" DESC, {col} LIMIT ?',
+                params + [top_n]
+            )
+            if len(failures):
+                ranking[col] = failures
+        return ranking
+    
+    def failure_statuses(self, months=None, state=None):
+        """Distinct FAILURE_STATUS values among the failed rosters"""
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state, IS_FAILED=1)
+        return self._query(
+            f'SELECT DISTINCT FAILURE_STATUS FROM roster{where} ORDER BY FAILURE_STATUS', params
+        )['FAILURE_STATUS'].tolist()
+    
+    def failure_count(self, statuses=None, months=None, state=None):
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state, IS_FAILED=1,
+                                      FAILURE_STATUS=statuses or None)
+        return int(self._query(f'SELECT COUNT(*) AS n FROM roster{where}', params)['n'].iloc[0])
+    
+    def _failures_sql(self, sort_by, ascending, statuses, months, state):
+        if sort_by not in FAILURE_SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort_by}")
+        where, params = _sqlite_where(MONTH=months, CNT_STATE=state, IS_FAILED=1,
+                                      FAILURE_STATUS=statuses or None)
+        # Missing values last either way, ties in table order
+        return (f'SELECT {", ".join(FAILURE_DETAIL_COLUMNS)} FROM roster{where} '
+                f'ORDER BY {sort_by} IS NULL, {sort_by} {"ASC" if ascending else "DESC"}, rowid'
+                ), params
+    
+    def failure_page(self, sort_by='LAST_UPDT_DT', ascending=False, statuses=None,
+                     page=0, page_size=50, months=None, state=None):
+        """One page of the failure details table, sorted and paged by the database"""
+        sql, params = self._failures_sql(sort_by, ascending, statuses, months, state)
+        return self._query(sql + ' LIMIT ? OFFSET ?', params + [page_size, page * page_size])
+    
+    def failure_chunks(self, sort_by='LAST_UPDT_DT', ascending=False, statuses=None,
+                       chunk_rows=EXPORT_CHUNK_ROWS, months=None, state=None):
+        """Every matching failure row in display order, streamed ``chunk_rows`` at a time"""
+        sql, params = self._failures_sql(sort_by, ascending, statuses, months, state)
+        return _sqlite_frames(self.db_path, sql, params, chunk_rows)
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def load_sqlite_metrics(path=METRICS_CSV, version=None):
+    """Metrics table in SQLite, built once per source version"""
+    mark_cache_miss()
+    try:
+        db_path = _sqlite_path('metrics', path, version or source_version(path))
+        if not os.path.exists(db_path):
+            agg_df = load_aggregated_metrics(path, version)
+            with instrument('build sqlite metrics', rows_in=len(agg_df)):
+                table = agg_df.drop(columns=['MONTH_DT'], errors='ignore').assign(
+                    MONTH=agg_df['MONTH'].astype(str),
+                    MONTH_SORT=agg_df['MONTH_SORT'].dt.strftime('%Y-%m')
+                )
+                build_sqlite_table(db_path, 'metrics', [table])
+        return SqliteMetrics(db_path)
+    except Exception as e:
+        st.error(f"Error building the SQLite metrics table for {path}: {e}")
+        return None
+
+
+@st.cache_resource(max_entries=CACHED_VERSIONS)
+def load_sqlite_roster(path=ROSTER_CSV, version=None):
+    """
+    Roster table in SQLite, built once per source version from the Parquet
+    cache one part at a time. The database file outlives the process, so a
+    restart on unchanged data skips ingestion entirely.
+    """
+    mark_cache_miss()
+    try:
+        version = version or source_version(path)
+        db_path = _sqlite_path('roster', path, version)
+        if not os.path.exists(db_path):
+            with instrument('build sqlite roster') as record:
+                frames = _roster_frames(path, version)
+                record['rows_out'] = build_sqlite_table(db_path, 'roster', frames) or 0
+        return SqliteRoster(db_path)
+    except Exception as e:
+        st.error(f"Error building the SQLite roster table for {path}: {e}")
+        return None
+
+
+# ============================================================================
+# RETRY CHAINS
+# ============================================================================
+
+# Per-RO_ID chain summary. Every field merges across row subsets (first run,
+# latest run and first successful run are picked by run number, run counts
+# add up), so a summary per Parquet part combines into the full index.
+CHAIN_ATTRIBUTES = ['ORG_NM', 'CNT_STATE', 'LOB', 'FAILURE_STATUS']
+
+
+def _runs_as_chains(roster_df):
+    """Each roster run as a one-run chain summary"""
+    run_no = roster_df['RUN_NO'].to_numpy(dtype='int64')
+    run_dt = pd.to_datetime(roster_df['LATEST_OBJECT_RUN_DT'], errors='coerce')
+    failed = roster_df['IS_FAILED'].to_numpy() == 1
+    chains = roster_df[['RO_ID'] + [c for c in CHAIN_ATTRIBUTES if c in roster_df.columns]].copy()
+    chains['MONTH'] = month_keys(roster_df).astype('category')
+    chains['RUNS'] = 1
+    chains['FIRST_RUN_NO'] = chains['LATEST_RUN_NO'] = run_no
+    chains['FIRST_DT'] = chains['LATEST_DT'] = run_dt
+    chains['FIRST_FAILED'] = chains['LATEST_FAILED'] = failed
+    chains['SUCCESS_RUN_NO'] = np.where(failed, np.nan, run_no)
+    chains['SUCCESS_DT'] = run_dt.where(~failed)
+    return chains
+
+
+def merge_chains(chains):
+    """
+    Combine chain summaries that share RO_IDs into one row per RO_ID.
+
+    Rows are grouped with one lexsort per ordering (by run number, then
+    timestamp) instead of a Python loop per roster: the first row of each
+    group gives the first run, the last row the latest run and the first
+    row by success run the recovery.
+    """
+    codes, ids = pd.factorize(chains['RO_ID'])
+    if len(ids) == len(chains):
+        return chains.reset_index(drop=True)
+    # Codes sorted first, so every ordering shares the same group bounds
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    ends = starts + sizes - 1
+    
+    def pick(run_col, dt_col, at):
+        runs = chains[run_col].to_numpy(dtype='float64')
+        dts = chains[dt_col].to_numpy(dtype='datetime64[ns]').astype('int64')
+        order = np.lexsort((dts, np.where(np.isnan(runs), np.inf, runs), codes))
+        return order[at]
+    
+    first = pick('FIRST_RUN_NO', 'FIRST_DT', starts)
+    latest = pick('LATEST_RUN_NO', 'LATEST_DT', ends)
+    success = pick('SUCCESS_RUN_NO', 'SUCCESS_DT', starts)
+    
+    latest_cols = ['RO_ID'] + [c for c in CHAIN_ATTRIBUTES if c in chains.columns] + [
+        'LATEST_RUN_NO', 'LATEST_DT', 'LATEST_FAILED']
+    result = chains[latest_cols].take(latest).reset_index(drop=True)
+    for col in ['MONTH', 'FIRST_RUN_NO', 'FIRST_DT', 'FIRST_FAILED']:
+        result[col] = chains[col].take(first).to_numpy()
+    for col in ['SUCCESS_RUN_NO', 'SUCCESS_DT']:
+        result[col] = chains[col].take(success).to_numpy()
+    result['MONTH'] = result['MONTH'].astype('category')
+    result['RUNS'] = np.bincount(codes, weights=chains['RUNS'].to_numpy()).astype('int64')
+    return result
+
+
+def chain_outcomes(chains):
+    """
+    Add the derived outcome columns: RECOVERED (first run failed, a later
+    run succeeded), RECOVERY_RUN_NO and RECOVERY_HOURS (from the first run
+    to the first successful one), and STILL_FAILING (latest run failed)
+    """
+    recovered = chains['FIRST_FAILED'].to_numpy() & chains['SUCCESS_RUN_NO'].notna().to_numpy()
+    chains = chains.assign(
+        RECOVERED=recovered,
+        RECOVERY_RUN_NO=chains['SUCCESS_RUN_NO'].where(recovered),
+        RECOVERY_HOURS=((chains['SUCCESS_DT'] - chains['FIRST_DT']).dt.total_seconds() / 3600)
+        .where(recovered),
+        STILL_FAILING=chains['LATEST_FAILED'].to_numpy(),
+    )
+    return chains
+
+
+class PartIndex:
+    """
+    A summary of the roster source maintained incrementally per cached
+    Parquet part. Subclasses define ``summarize(df)`` (one part's summary,
+    or None) and ``merge(summaries)`` (the index from a list of summaries,
+    possibly empty). Each part is summarized once; a new data version only
+    summarizes the parts it added (an appended tail, a compacted month)
+    before re-merging the per-part summaries, which are far smaller than
+    the rows.
+    """
+    stage = 'part index'
+    versions_kept = CACHED_VERSIONS
+    
+    def __init__(self, path):
+        self.path = path
+        self._summaries = {}
+        self._indexes = OrderedDict()
+        # Lookups only hold ``_lock`` briefly; building holds ``_build_lock``,
+        # so serving a kept version never waits for a build
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+    
+    def summarize(self, df):
+        raise NotImplementedError
+    
+    def merge(self, summaries):
+        raise NotImplementedError
+    
+    def _kept(self, version):
+        with self._lock:
+            if version is not None and version in self._indexes:
+                self._indexes.move_to_end(version)
+                return self._indexes[version]
+        return None
+    
+    def get(self, version=None):
+        """The index for the roster source as of ``version`` (None: as it is now)"""
+        index = self._kept(version)
+        if index is not None:
+            return index
+        with self._build_lock:
+            index = self._kept(version)
+            if index is not None:
+                return index
+            with instrument(self.stage) as record:
+                summaries = {}
+                try:
+                    for key, load in cached_parts(self.path, read_roster_csv, version):
+                        summary = self._summaries.get(key) if key is not None else None
+                        if summary is None:
+                            df = load()
+                            summary = self.summarize(df) if len(df) else None
+                        if summary is not None:
+                            summaries[key or len(summaries)] = summary
+                except OSError:
+                    # No source (or it vanished mid-read): an empty index,
+                    # not remembered, so the next call looks again
+                    record['rows_out'] = 0
+                    return self.merge([])
+                self._summaries = summaries
+                index = self.merge(list(summaries.values()))
+                record['rows_out'] = len(index)
+            if version is not None:
+                with self._lock:
+                    self._indexes[version] = index
+                    while len(self._indexes) > self.versions_kept:
+                        self._indexes.popitem(last=False)
+            return index
+
+
+class RetryChains(PartIndex):
+    """
+    Retry-chain index over RO_ID / RUN_NO: one row per roster with its
+    first and latest run, final outcome and time to recovery.
+    """
+    stage = 'retry chains'
+    
+    def summarize(self, df):
+        return merge_chains(_runs_as_chains(df))
+    
+    def merge(self, summaries):
+        if not summaries:
+            summaries = [_runs_as_chains(pd.DataFrame(
+                columns=['RO_ID', 'RUN_NO', 'IS_FAILED', 'LATEST_OBJECT_RUN_DT']))]
+        return chain_outcomes(merge_chains(concat_compact(summaries)))
+
+
+@st.cache_resource
+def get_retry_chains(path=ROSTER_CSV):
+    """Process-wide retry-chain index for a roster source"""
+    return RetryChains(path)
+
+
+def select_summary(summary, months=None, state=None):
+    """
+    Rows of a per-roster or per-group summary (retry chains, duration
+    sketches) whose MONTH is in ``months`` and CNT_STATE is ``state``
+    """
+    if summary.empty:
+        return summary
+    keep = np.ones(len(summary), dtype=bool)
+    if months is not None:
+        keep &= summary['MONTH'].isin(months).to_numpy()
+    if state is not None:
+        keep &= (summary['CNT_STATE'] == state).to_numpy()
+    return summary if keep.all() else summary[keep]
+
+
+def recovery_rates(chains, by='CNT_STATE'):
+    """
+    Per-``by`` recovery statistics over rosters whose first run failed:
+    how many, how many recovered, the recovery rate and the median hours
+    to recovery, plus how many are still failing. Largest groups first.
+    """
+    failed_first = chains[chains['FIRST_FAILED'].to_numpy()]
+    if failed_first.empty or by not in failed_first.columns:
+        return pd.DataFrame(columns=[by, 'Failed First Run', 'Recovered',
+                                     'Recovery Rate', 'Median Hours to Recovery',
+                                     'Still Failing'])
+    rates = (
+        failed_first.groupby(by, observed=True)
+        .agg(**{
+            'Failed First Run': ('RECOVERED', 'size'),
+            'Recovered': ('RECOVERED', 'sum'),
+            'Median Hours to Recovery': ('RECOVERY_HOURS', 'median'),
+            'Still Failing': ('STILL_FAILING', 'sum'),
+        })
+        .reset_index()
+    )
+    rates.insert(3, 'Recovery Rate', rates['Recovered'] / rates['Failed First Run'] * 100)
+    return rates.sort_values(['Failed First Run', by], ascending=[False, True],
+                             ignore_index=True)
+
+
+def recovery_summary(chains):
+    """Headline recovery numbers for the retry-chain section"""
+    failed_first = chains['FIRST_FAILED'].to_numpy()
+    recovered = chains['RECOVERED'].to_numpy()
+    return {
+        'rosters': len(chains),
+        'failed_first_run': int(failed_first.sum()),
+        'recovered': int(recovered.sum()),
+        'recovery_rate': recovered.sum() / failed_first.sum() * 100 if failed_first.any() else 0.0,
+        'median_recovery_hours': chains['RECOVERY_HOURS'].median(),
+        'still_failing': int(chains['STILL_FAILING'].sum()),
+    }
+
+
+def still_failing(chains, min_runs=2, limit=None):
+    """Rosters whose latest run failed after at least ``min_runs`` runs, most runs first"""
+    stuck = chains[chains['STILL_FAILING'].to_numpy() & (chains['RUNS'].to_numpy() >= min_runs)]
+    stuck = stuck.sort_values(['RUNS', 'LATEST_DT'], ascending=[False, False])
+    if limit is not None:
+        stuck = stuck.head(limit)
+    columns = ['RO_ID', 'ORG_NM', 'CNT_STATE', 'LOB', 'RUNS', 'LATEST_RUN_NO',
+               'FAILURE_STATUS', 'FIRST_DT', 'LATEST_DT']
+    return stuck[[c for c in columns if c in stuck.columns]].reset_index(drop=True)
+
+
+def create_recovery_chart(rates, group_by='CNT_STATE', top_n=10):
+    """Bar chart of recovery rate for the ``top_n`` groups with the most first-run failures"""
+    if rates.empty:
+        return None
+    top = rates.head(top_n)
+    
+    fig = px.bar(
+        top,
+        x=group_by,
+        y='Recovery Rate',
+        title=f'Recovery Rate After a Failed First Run (Top {top_n} by {group_by})',
+        labels={'Recovery Rate': 'Recovered (%)', group_by: group_by},
+        hover_data=['Failed First Run', 'Recovered', 'Median Hours to Recovery'],
+        color='Recovery Rate',
+        color_continuous_scale='Greens'
     )
     
     fig.update_layout(
         xaxis_tickangle=-45,
+        yaxis=dict(range=[0, 100]),
         height=400,
         showlegend=False
     )
@@ -433,31 +2486,732 @@ def create_duration_analysis(roster_df):
     return fig
 
 
+# ============================================================================
+# DURATION SKETCHES
+# ============================================================================
+
+# Filter grain every duration sketch is kept at
+SKETCH_DIMENSIONS = ['MONTH', 'CNT_STATE']
+# One sketch per SLO breakdown, keyed by SKETCH_DIMENSIONS plus that column,
+# with the relative accuracy of its quantiles (a reported p95 is within that
+# fraction of a duration that really has that rank). The state sketch also
+# serves the overall percentiles. Organization and LOB sketches use wider
+# buckets: most organizations have a handful of runs a month, so at 1% their
+# cells would outnumber the rows behind them.
+SKETCH_ACCURACY = {'CNT_STATE': 0.01, 'ORG_NM': 0.05, 'LOB': 0.05}
+SLO_QUANTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+# Breakdowns offered by the SLO view, with their labels
+SLO_DIMENSIONS = {'ORG_NM': 'Organization', 'CNT_STATE': 'State', 'LOB': 'Line of business'}
+# Default p95 targets in minutes for the stage-latency SLO view
+STAGE_SLO_MINUTES = {
+    'PRE_PROCESSING_DURATION': 15,
+    'ISF_GEN_DURATION': 40,
+    'DART_GEN_DURATION': 12,
+    'SPS_LOAD_DURATION': 80,
+}
+
+
+def _sketch_gamma(by):
+    """Bucket growth factor of the sketch for breakdown ``by``"""
+    accuracy = SKETCH_ACCURACY[by]
+    return (1 + accuracy) / (1 - accuracy)
+
+
+def _sketch_keys(by):
+    """Cell key columns of the sketch for breakdown ``by``"""
+    return SKETCH_DIMENSIONS + ([by] if by not in SKETCH_DIMENSIONS else []) + ['STAGE', 'BUCKET']
+
+
+def _count_cells(cells, by):
+    """Cells with equal keys merged, counts summed"""
+    return (cells.groupby(_sketch_keys(by), observed=True)['COUNT'].sum()
+            .astype('int32').reset_index())
+
+
+def sketch_durations(roster_df):
+    """
+    Log-bucket (DDSketch-style) sketches of the positive stage durations:
+    ``{breakdown: cells}`` with one row per (MONTH, CNT_STATE[, breakdown],
+    STAGE, BUCKET) cell counting the durations in
+    ``(gamma^(BUCKET-1), gamma^BUCKET]``. Sketches of any row subsets merge
+    by adding the counts of equal cells.
+    """
+    keys = pd.DataFrame({'MONTH': month_keys(roster_df).astype('category')})
+    for col in SKETCH_DIMENSIONS[1:] + list(SKETCH_ACCURACY):
+        if col not in keys.columns:
+            keys[col] = roster_df[col] if col in roster_df.columns else 'Unknown'
+    
+    frames = []
+    for code, stage in enumerate(DURATION_STAGES):
+        if stage not in roster_df.columns:
+            continue
+        values = roster_df[stage].to_numpy(dtype='float64')
+        positive = values > 0
+        frames.append(keys[positive].assign(
+            STAGE=pd.Categorical.from_codes(np.full(int(positive.sum()), code, dtype='int8'),
+                                            categories=list(DURATION_STAGES)),
+            LOG=np.log(values[positive]),
+        ))
+    if not frames:
+        return None
+    cells = pd.concat(frames, ignore_index=True)
+    logs = cells.pop('LOG').to_numpy()
+    
+    sketches = {}
+    for by in SKETCH_ACCURACY:
+        buckets = np.ceil(logs / np.log(_sketch_gamma(by))).astype('int16')
+        sketches[by] = (cells[_sketch_keys(by)[:-1]].assign(BUCKET=buckets)
+                        .groupby(_sketch_keys(by), observed=True).size()
+                        .astype('int32').rename('COUNT').reset_index())
+    return sketches
+
+
+def merge_sketches(sketches):
+    """One set of sketches with the counts of every cell summed across ``sketches``"""
+    merged = {}
+    for by in SKETCH_ACCURACY:
+        frames = [s[by] for s in sketches]
+        if not frames:
+            merged[by] = pd.DataFrame(columns=_sketch_keys(by) + ['COUNT'])
+        elif len(frames) == 1:
+            merged[by] = frames[0]
+        else:
+            merged[by] = _count_cells(concat_compact(frames), by)
+    return merged
+
+
+def select_sketches(sketches, months=None, state=None):
+    """The cells of every sketch within the month and state filter"""
+    return {by: select_summary(cells, months, state) for by, cells in sketches.items()}
+
+
+def sketch_quantiles(sketches, by=None, quantiles=SLO_QUANTILES):
+    """
+    Duration quantiles per stage (and per ``by`` value) from the sketch for
+    that breakdown (the state sketch when ``by`` is None).
+
+    Cells are merged per group and walked with one cumulative sum and a
+    searchsorted per quantile, so the cost follows the number of cells,
+    not the number of rows behind them.
+    """
+    sketch = sketches[by or 'CNT_STATE']
+    keys = ([by] if by else []) + ['STAGE']
+    if sketch.empty:
+        return pd.DataFrame(columns=keys[:-1] + ['Stage', 'count'] + list(quantiles))
+    # Sorted by group, then bucket
+    cells = sketch.groupby(keys + ['BUCKET'], observed=True)['COUNT'].sum().reset_index()
+    counts = cells['COUNT'].to_numpy(dtype='int64')
+    buckets = cells['BUCKET'].to_numpy(dtype='float64')
+    group = cells.groupby(keys, observed=True, sort=False).ngroup().to_numpy()
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    totals = np.add.reduceat(counts, starts)
+    cumulative = np.cumsum(counts)
+    before = cumulative[starts] - counts[starts]
+    gamma = _sketch_gamma(by or 'CNT_STATE')
+    
+    result = cells[keys].take(starts).reset_index(drop=True)
+    result['count'] = totals
+    for name, q in quantiles.items():
+        # First cell whose cumulative count passes the quantile's rank
+        at = np.searchsorted(cumulative, before + np.floor(q * (totals - 1)), side='right')
+        result[name] = 2 * gamma ** buckets[at] / (gamma + 1)
+    result['STAGE'] = result['STAGE'].map(DURATION_STAGES)
+    return result.rename(columns={'STAGE': 'Stage'})
+
+
+class DurationSketches(PartIndex):
+    """Duration sketches of the whole roster source, maintained per cached part"""
+    stage = 'duration sketches'
+    
+    def summarize(self, df):
+        return sketch_durations(df)
+    
+    def merge(self, summaries):
+        return merge_sketches(summaries)
+
+
+@st.cache_resource
+def get_duration_sketches(path=ROSTER_CSV):
+    """Process-wide duration sketches for a roster source"""
+    return DurationSketches(path)
+
+
+def stage_slo(sketches, by='ORG_NM', stage='SPS_LOAD_DURATION'):
+    """One stage's quantiles per ``by`` value, slowest p95 first"""
+    sketch = sketches[by]
+    report = sketch_quantiles({by: sketch[sketch['STAGE'] == stage]}, by)
+    return report.drop(columns='Stage').sort_values(['p95', by], ascending=[False, True],
+                                                    ignore_index=True)
+
+
+def create_slo_chart(report, group_by='ORG_NM', target=None, top_n=15):
+    """Bar chart of the ``top_n`` slowest p95 durations against the SLO target"""
+    if report.empty:
+        return None
+    worst = report.head(top_n).assign(
+        Status=lambda d: np.where(d['p95'] <= target, 'Meets SLO', 'Breaches SLO')
+    )
+    
+    fig = px.bar(
+        worst,
+        x=group_by,
+        y='p95',
+        title=f'Slowest {top_n} by p95 Duration ({SLO_DIMENSIONS.get(group_by, group_by)})',
+        labels={'p95': 'p95 Duration (min)', group_by: SLO_DIMENSIONS.get(group_by, group_by)},
+        hover_data=['count', 'p50', 'p99'],
+        color='Status',
+        color_discrete_map={'Meets SLO': '#2ecc71', 'Breaches SLO': '#e74c3c'}
+    )
+    if target is not None:
+        fig.add_hline(y=target, line_dash='dash', line_color='#666',
+                      annotation_text=f'Target {target:g} min')
+    
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        height=400
+    )
+    
+    return fig
+
+
+# ============================================================================
+# DISTINCT COUNTS
+# ============================================================================
+
+# Roster columns with cardinality KPIs, and their labels
+DISTINCT_COLUMNS = {'ORG_NM': '🏢 Organizations', 'RO_ID': '🗂️ Rosters',
+                    'SRC_SYS': '🔌 Source Systems'}
+# HyperLogLog precision: 2^12 one-byte registers per group, ~1.6% standard error
+HLL_PRECISION = 12
+# A group keeps its exact set of value hashes up to this many distinct
+# values, so small data gets exact counts; past it only registers remain
+DISTINCT_EXACT_LIMIT = 4096
+
+
+def _value_hashes(values):
+    """64-bit hash per non-missing value; categoricals hash each category once"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        present = codes >= 0
+        categories = np.asarray(values.cat.categories, dtype=object)
+        return pd.util.hash_array(categories)[codes[present]], present
+    present = values.notna().to_numpy()
+    return pd.util.hash_array(values.to_numpy(dtype=object)[present]), present
+
+
+def _distinct_groups(roster_df):
+    """(MONTH, CNT_STATE) group code per row and the groups in code order"""
+    month_codes, months = pd.factorize(month_keys(roster_df))
+    state_codes, states = pd.factorize(roster_df['CNT_STATE'])
+    codes, pairs = pd.factorize(month_codes.astype('int64') * max(len(states), 1) + state_codes)
+    groups = [(months[c // max(len(states), 1)], str(states[c % max(len(states), 1)]))
+              for c in pairs]
+    return codes, groups
+
+
+class DistinctSketch:
+    """
+    HyperLogLog registers for one column per (MONTH, CNT_STATE) group, plus
+    the exact value hashes of groups still under DISTINCT_EXACT_LIMIT.
+    Sketches merge group by group (register max, hash union), and a count
+    over any set of groups is exact when all of them kept their hashes.
+    """
+    
+    def __init__(self, groups, registers, exact, pairs):
+        self.groups = groups          # list of (month, state)
+        self.registers = registers    # uint8 (groups, 2^HLL_PRECISION)
+        self.exact = exact            # bool per group
+        self.pairs = pairs            # (group, hash) arrays for exact groups
+    
+    @classmethod
+    def from_frame(cls, roster_df, col, groups=None):
+        """Sketch of ``col``; pass ``_distinct_groups(roster_df)`` to share it across columns"""
+        codes, groups = groups or _distinct_groups(roster_df)
+        hashes, present = _value_hashes(roster_df[col])
+        codes = codes[present]
+        
+        # Register index from the top bits, rank from the leading zeros of the rest
+        m = 1 << HLL_PRECISION
+        rest_bits = 64 - HLL_PRECISION
+        index = (hashes >> np.uint64(rest_bits)).astype('int64')
+        rest = (hashes & np.uint64((1 << rest_bits) - 1)).astype('float64')
+        rank = (rest_bits + 1 - np.frexp(rest)[1]).astype('uint8')
+        registers = np.zeros((len(groups), m), dtype='uint8')
+        np.maximum.at(registers.ravel(), codes * m + index, rank)
+        
+        pairs = (codes.astype('int64'), hashes)
+        return cls(list(groups), registers, np.ones(len(groups), dtype=bool), pairs)._trim()
+    
+    def _trim(self):
+        """Dedupe the exact hashes and drop them for groups past the limit"""
+        group, hashes = self.pairs
+        unique = pd.DataFrame({'g': group, 'h': hashes}).drop_duplicates()
+        counts = np.bincount(unique['g'].to_numpy(), minlength=len(self.groups))
+        self.exact &= counts <= DISTINCT_EXACT_LIMIT
+        unique = unique[self.exact[unique['g'].to_numpy()]]
+        self.pairs = (unique['g'].to_numpy(), unique['h'].to_numpy())
+        return self
+    
+    @classmethod
+    def merge(cls, sketches):
+        groups = list(dict.fromkeys(g for s in sketches for g in s.groups))
+        position = {g: i for i, g in enumerate(groups)}
+        registers = np.zeros((len(groups), 1 << HLL_PRECISION), dtype='uint8')
+        exact = np.ones(len(groups), dtype=bool)
+        group_parts, hash_parts = [], []
+        for s in sketches:
+            at = np.array([position[g] for g in s.groups], dtype='int64')
+            if not len(at):
+                continue
+            np.maximum.at(registers, at, s.registers)
+            np.logical_and.at(exact, at, s.exact)
+            group_parts.append(at[s.pairs[0]])
+            hash_parts.append(s.pairs[1])
+        pairs = (np.concatenate(group_parts or [np.empty(0, dtype='int64')]),
+                 np.concatenate(hash_parts or [np.empty(0, dtype='uint64')]))
+        merged = cls(groups, registers, exact, pairs)
+        # Drop hashes of groups that stopped being exact in another part
+        keep = exact[pairs[0]]
+        merged.pairs = (pairs[0][keep], pairs[1][keep])
+        return merged._trim()
+    
+    def count(self, months=None, state=None):
+        """Distinct values in the selected groups and whether the count is exact"""
+        selected = np.array([(months is None or month in months)
+                             and (state is None or group_state == state)
+                             for month, group_state in self.groups], dtype=bool)
+        if not selected.any():
+            return 0, True
+        if self.exact[selected].all():
+            group, hashes = self.pairs
+            return len(np.unique(hashes[selected[group]])), True
+        return hll_estimate(self.registers[selected].max(axis=0)), False
+
+
+def hll_estimate(registers):
+    """HyperLogLog cardinality estimate, with linear counting for small values"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype('int64')))
+    zeros = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+class DistinctCounts(PartIndex):
+    """Distinct-value sketches of DISTINCT_COLUMNS, maintained per cached part"""
+    stage = 'distinct counts'
+    
+    def summarize(self, df):
+        groups = _distinct_groups(df)
+        return {col: DistinctSketch.from_frame(df, col, groups)
+                for col in DISTINCT_COLUMNS if col in df.columns}
+    
+    def merge(self, summaries):
+        return {col: DistinctSketch.merge([s[col] for s in summaries if col in s])
+                for col in DISTINCT_COLUMNS}
+
+
+@st.cache_resource
+def get_distinct_counts(path=ROSTER_CSV):
+    """Process-wide distinct-value sketches for a roster source"""
+    return DistinctCounts(path)
+
+
+def count_distinct(sketches, months=None, state=None):
+    """``{column: (count, exact)}`` for the month and state filter"""
+    return {col: sketch.count(months, state) for col, sketch in sketches.items()}
+
+
+# ============================================================================
+# CHART RENDERING
+# ============================================================================
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling: positions of ``threshold``
+    points that preserve the visual shape of the series (x, y).
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def top_n_with_other(counts, n, other_label='Other'):
+    """Keep the ``n`` largest entries of a count Series and fold the rest into one bucket"""
+    if len(counts) <= n:
+        return counts
+    top = counts.nlargest(n)
+    rest = counts.drop(top.index).sum()
+    return pd.concat([top, pd.Series({other_label: rest})])
+
+
+def _box_to_summary(trace):
+    """Replace a raw-point box trace with its quantile summary"""
+    y = np.asarray(trace.y, dtype=float)
+    y = y[~np.isnan(y)]
+    q1, median, q3 = np.quantile(y, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    name = trace.x[0] if trace.x is not None and len(trace.x) else trace.name
+    trace.update(
+        x=[name], y=None, q1=[q1], median=[median], q3=[q3],
+        lowerfence=[y[y >= q1 - 1.5 * iqr].min()],
+        upperfence=[y[y <= q3 + 1.5 * iqr].max()],
+        boxpoints=False
+    )
+
+
+def _bar_to_top_n(trace, n):
+    """Keep the ``n - 1`` tallest bars of a trace and fold the rest into 'Other'"""
+    y = np.asarray(trace.y, dtype=float)
+    order = np.argsort(-y, kind='stable')
+    keep, rest = order[:n - 1], order[n - 1:]
+    updates = {
+        'x': list(np.asarray(trace.x, dtype=object)[keep]) + ['Other'],
+        'y': list(y[keep]) + [y[rest].sum()],
+    }
+    color = trace.marker.color
+    if color is not None and not isinstance(color, str) and len(color) == len(y):
+        color = np.asarray(color)
+        updates['marker_color'] = list(color[keep]) + [OTHER_BAR_COLOR]
+    trace.update(**updates)
+
+
+def figure_points(fig):
+    """Number of data points a figure ships to the browser"""
+    total = 0
+    for trace in fig.data:
+        values = trace.y if getattr(trace, 'y', None) is not None else getattr(trace, 'x', None)
+        total += len(values) if values is not None else 0
+    return total
+
+
+def enforce_point_budget(fig, budget=None):
+    """
+    Shrink a figure in place so it carries at most ``budget`` points,
+    split evenly across traces: box plots become quantile summaries, line
+    and scatter traces are LTTB-downsampled and bar traces keep their
+    tallest bars plus an 'Other' bucket.
+    """
+    budget = budget or FIGURE_POINT_BUDGET
+    per_trace = max(3, budget // max(1, len(fig.data)))
+    for trace in fig.data:
+        y = getattr(trace, 'y', None)
+        if y is None or len(y) <= per_trace:
+            continue
+        if trace.type == 'box':
+            _box_to_summary(trace)
+        elif trace.type in ('scatter', 'scattergl'):
+            y_values = np.asarray(y, dtype=float)
+            x_values = np.asarray(trace.x) if trace.x is not None else None
+            if x_values is None or not np.issubdtype(x_values.dtype, np.number):
+                x_numeric = np.arange(len(y_values), dtype=float)
+            else:
+                x_numeric = x_values.astype(float)
+            keep = lttb_indices(x_numeric, y_values, per_trace)
+            trace.update(
+                x=None if x_values is None else x_values[keep],
+                y=y_values[keep]
+            )
+        elif trace.type == 'bar':
+            _bar_to_top_n(trace, per_trace)
+    return fig
+
+
+# A figure that already fits the point budget, with its serialized size
+ChartEntry = namedtuple('ChartEntry', ['fig', 'points', 'bytes'])
+
+
+def prepare_chart(fig):
+    """Enforce the point budget on ``fig`` and measure its JSON payload"""
+    enforce_point_budget(fig)
+    with instrument('serialize figure') as record:
+        payload = len(fig.to_json())
+        record['rows_out'] = figure_points(fig)
+    return ChartEntry(fig, record['rows_out'], payload)
+
+
+def render_chart(chart, name):
+    """
+    Draw a figure (or a prepared ChartEntry) and record its point count and
+    payload size under ``name`` for the payload report.
+    """
+    if not hasattr(chart, 'fig'):
+        chart = prepare_chart(chart)
+    st.session_state.setdefault('chart_payloads', {})[name] = {
+        'points': chart.points,
+        'bytes': chart.bytes
+    }
+    with instrument(f'render {name}'):
+        st.plotly_chart(chart.fig, use_container_width=True)
+
+
+def render_payload_report():
+    """Sidebar summary of the chart payloads sent on this rerun"""
+    payloads = st.session_state.get('chart_payloads', {})
+    if not payloads:
+        return
+    with st.sidebar.expander("📦 Chart payload"):
+        report = pd.DataFrame.from_dict(payloads, orient='index')
+        report['KB'] = (report['bytes'] / 1024).round(1)
+        st.dataframe(report[['points', 'KB']], use_container_width=True)
+        st.caption(
+            f"Total {report['bytes'].sum() / 1024:,.1f} KB, "
+            f"budget {FIGURE_POINT_BUDGET:,} points per chart"
+        )
+
+
+# ============================================================================
+# VIEW CACHE
+# ============================================================================
+
+# Bounds for memoized KPIs, figures and tables shared by all sessions
+VIEW_CACHE_MAX_ENTRIES = 256
+VIEW_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _view_size(value):
+    """Approximate memory held by a cached view, in bytes"""
+    # Checked by attribute, not isinstance: this script (and the ChartEntry
+    # class) is re-executed on every rerun while cached entries outlive it
+    if hasattr(value, 'fig'):
+        return value.bytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    # Views such as the failure ranking or the API's recovery section hold
+    # frames inside containers
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_view_size(k) + _view_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_view_size(v) for v in value)
+    if value is None or isinstance(value, (str, bytes, int, float, np.generic)):
+        return sys.getsizeof(value)
+    return 1024
+
+
+class ViewCache:
+    """
+    Thread-safe LRU cache of built views (KPI dicts, chart entries, tables)
+    keyed by view name, data version and filter state.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the approximate total size exceeds its bound.
+    """
+    
+    def __init__(self, max_entries=VIEW_CACHE_MAX_ENTRIES, max_bytes=VIEW_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        
+        # Build outside the lock so slow views don't serialize other sessions
+        value = build()
+        size = _view_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self.bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+        return value
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+@st.cache_resource
+def get_view_cache():
+    """Process-wide view cache shared by every session"""
+    return ViewCache()
+
+
+def cached_view(key, build):
+    """Memoize ``build()`` under ``key`` in the shared view cache"""
+    def build_and_record():
+        mark_cache_miss()
+        return build()
+    with instrument(key[0], cached=True) as record:
+        value = get_view_cache().get_or_build(key, build_and_record)
+        if isinstance(value, pd.DataFrame):
+            record['rows_out'] = len(value)
+    return value
+
+
+def cached_chart(key, build):
+    """Memoize a figure builder; returns a budgeted ChartEntry or None"""
+    def build_entry():
+        fig = build()
+        return prepare_chart(fig) if fig is not None else None
+    return cached_view(key, build_entry)
+
+
+# ============================================================================
+# BACKGROUND REFRESH
+# ============================================================================
+
+LOGGER = logging.getLogger('roster_dashboard')
+# Seconds between checks of the source files for changes (override with the
+# ROSTER_REFRESH_SECONDS environment variable)
+REFRESH_INTERVAL = float(os.environ.get('ROSTER_REFRESH_SECONDS', 5))
+
+Snapshot = namedtuple('Snapshot', ['metrics_version', 'roster_version', 'cube', 'loaded_at'])
+
+
+def build_snapshot(metrics_path=METRICS_CSV, roster_path=ROSTER_CSV, warm_roster=False):
+    """
+    Load the sources at their current versions. With ``warm_roster`` the
+    full roster table and its filter index (or its SQLite table), the
+    retry-chain index and the duration and distinct-value sketches are
+    ingested and cached too, so the first rerun on the new version finds
+    them ready.
+    """
+    metrics_version = source_version(metrics_path)
+    roster_version = source_version(roster_path)
+    cube = load_metrics_cube(metrics_path, metrics_version)
+    if ROSTER_BACKEND == 'sqlite':
+        load_sqlite_metrics(metrics_path, metrics_version)
+    if warm_roster and roster_version is not None:
+        if ROSTER_BACKEND == 'sqlite':
+            load_sqlite_roster(roster_path, roster_version)
+        else:
+            load_roster_index(roster_path, roster_version)
+        get_retry_chains(roster_path).get(roster_version)
+        get_duration_sketches(roster_path).get(roster_version)
+        get_distinct_counts(roster_path).get(roster_version)
+    return Snapshot(metrics_version, roster_version, cube, datetime.now())
+
+
+class DataStore:
+    """
+    The data version every session renders from. A daemon thread polls the
+    source files and, when either changes, builds the next snapshot off the
+    request path and swaps it in with a single reference assignment, so
+    reruns never block on ingestion and never mix two versions.
+    """
+    
+    def __init__(self, metrics_path=METRICS_CSV, roster_path=ROSTER_CSV,
+                 interval=REFRESH_INTERVAL):
+        self.metrics_path = metrics_path
+        self.roster_path = roster_path
+        self.snapshot = build_snapshot(metrics_path, roster_path)
+        # The thread only holds a weak reference so it exits once the store
+        # is dropped from the resource cache
+        threading.Thread(
+            target=DataStore._watch, args=(weakref.ref(self), interval),
+            name='roster-refresh', daemon=True
+        ).start()
+    
+    def changed(self):
+        """True if either source differs from the current snapshot"""
+        current = self.snapshot
+        return (source_version(self.metrics_path) != current.metrics_version
+                or source_version(self.roster_path) != current.roster_version)
+    
+    def refresh(self):
+        """Build a snapshot of the current sources and swap it in"""
+        self.snapshot = build_snapshot(self.metrics_path, self.roster_path, warm_roster=True)
+        if ROSTER_BACKEND == 'sqlite':
+            # The old version's databases stay until other processes caught up
+            snapshot = self.snapshot
+            remove_superseded_sqlite(_sqlite_path('metrics', self.metrics_path,
+                                                  snapshot.metrics_version))
+            if snapshot.roster_version is not None:
+                remove_superseded_sqlite(_sqlite_path('roster', self.roster_path,
+                                                      snapshot.roster_version))
+    
+    @staticmethod
+    def _watch(store_ref, interval):
+        while True:
+            time.sleep(interval)
+            store = store_ref()
+            if store is None:
+                return
+            try:
+                if store.changed():
+                    store.refresh()
+            except Exception:
+                LOGGER.exception("Background refresh failed; keeping the data loaded at %s",
+                                 store.snapshot.loaded_at)
+            del store
+
+
+@st.cache_resource
+def get_data_store():
+    """Process-wide data store (and its refresh thread) shared by every session"""
+    return DataStore()
+
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
 def main():
+    configure_page()
+    
     # Header
     st.title("📊 Roster Processing Dashboard")
     st.markdown("**Automated Analytics Pipeline** | HiLabs Workshop @ E-Summit IIT Roorkee")
     st.markdown("---")
     
-    # Load data
-    with st.spinner("Loading data..."):
-        agg_df = load_aggregated_metrics()
-        roster_df = load_roster_processing_details()
+    # Payload sizes and stage timings are reported per rerun
+    st.session_state['chart_payloads'] = {}
+    start_perf_run(track_memory=st.session_state.get('perf_panel', False))
     
-    if agg_df.empty and roster_df.empty:
-        st.error("❌ No data available. Please ensure CSV files are in the correct location.")
-        return
+    # Load data - only the very first run builds the snapshot; later
+    # changes to the CSVs are ingested in the background and swapped in
+    with st.spinner("Loading data..."):
+        with instrument('data snapshot', cached=True):
+            snapshot = get_data_store().snapshot
+    metrics_version = snapshot.metrics_version
+    roster_version = snapshot.roster_version
+    cube = snapshot.cube
+    # KPIs and trend charts query SQLite instead when that backend is on
+    metrics = cube
+    if ROSTER_BACKEND == 'sqlite':
+        metrics = load_sqlite_metrics(METRICS_CSV, metrics_version) or cube
     
     # Sidebar filters
     st.sidebar.header("🔍 Filters")
     
     # Month filter
-    if not agg_df.empty and 'MONTH' in agg_df.columns:
-        available_months = sorted(agg_df['MONTH'].unique(), reverse=True)
+    if not cube.empty:
+        # Newest month first
+        available_months = cube.months[::-1]
         selected_month = st.sidebar.selectbox(
             "Select Month",
             options=['All'] + list(available_months),
@@ -468,28 +3222,35 @@ def main():
     else:
         selected_month = None
     
+    if cube.empty and roster_version is None:
+        st.error("❌ No data available. Please ensure CSV files are in the correct location.")
+        return
+    
     # Market filter
-    if not agg_df.empty and 'MARKET' in agg_df.columns:
-        available_markets = ['All'] + sorted(agg_df['MARKET'].unique().tolist())
+    selected_market = None
+    if not cube.empty:
+        available_markets = ['All'] + cube.markets
         selected_market = st.sidebar.selectbox("Select Market", available_markets)
-        if selected_market != 'All':
-            agg_df = agg_df[agg_df['MARKET'] == selected_market]
+        if selected_market == 'All':
+            selected_market = None
     
-    # State filter
-    if not roster_df.empty and 'CNT_STATE' in roster_df.columns:
-        available_states = ['All'] + sorted(roster_df['CNT_STATE'].unique().tolist())
-        selected_state = st.sidebar.selectbox("Select State", available_states)
-        if selected_state != 'All':
-            roster_df = roster_df[roster_df['CNT_STATE'] == selected_state]
+    # State filter - filled in once the roster table has loaded
+    state_slot = st.sidebar.empty()
     
     st.sidebar.markdown("---")
     st.sidebar.info(
         "💡 **Tip**: Use filters to drill down into specific months, "
         "markets, or states for detailed analysis."
     )
+    st.sidebar.caption(f"Data loaded {snapshot.loaded_at:%Y-%m-%d %H:%M:%S}")
     
     # Compute KPIs
-    kpis = compute_kpis(agg_df, roster_df, selected_month)
+    # Views are memoized on the data versions and the filters they depend on
+    metrics_key = (metrics_version, selected_market)
+    kpis = cached_view(
+        ('kpis', metrics_version, selected_month, selected_market),
+        lambda: compute_kpis(metrics, None, selected_month, selected_market)
+    )
     
     # Display KPIs
     st.subheader("📈 Key Performance Indicators")
@@ -533,19 +3294,72 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        trend_chart = create_monthly_trend(agg_df)
+        trend_chart = cached_chart(
+            ('trend',) + metrics_key,
+            lambda: create_monthly_trend(metrics, selected_market)
+        )
         if trend_chart:
-            st.plotly_chart(trend_chart, use_container_width=True)
+            render_chart(trend_chart, 'Monthly trend')
         else:
             st.info("Monthly trend data not available")
     
     with col2:
-        iter_chart = create_first_vs_next_iter(agg_df)
+        iter_chart = cached_chart(
+            ('iterations',) + metrics_key,
+            lambda: create_first_vs_next_iter(metrics, selected_market)
+        )
         if iter_chart:
-            st.plotly_chart(iter_chart, use_container_width=True)
+            render_chart(iter_chart, 'First vs next iteration')
         else:
             st.info("Iteration comparison data not available")
     
+    # Everything below needs the roster table. It is loaded only now, so the
+    # KPIs and trend charts above are already on screen while it loads, and
+    # only the selected month's partitions are read. With the SQLite backend
+    # nothing is loaded: each view below is a query over ``roster_query``
+    roster_months = None if selected_month is None else (month_partition(selected_month),)
+    roster_db = roster_df = None
+    with st.spinner("Loading roster details..."):
+        with instrument('load roster', cached=True) as record:
+            if ROSTER_BACKEND == 'sqlite':
+                roster_db = load_sqlite_roster(ROSTER_CSV, roster_version)
+            if roster_db is None:
+                roster_index = load_roster_index(ROSTER_CSV, roster_version, roster_months)
+                roster_df = roster_index.frame
+                record['rows_out'] = len(roster_df)
+    
+    if roster_db:
+        state_options = cached_view(('states', roster_version, roster_months),
+                                    lambda: roster_db.options('CNT_STATE', roster_months))
+    else:
+        state_options = roster_index.options('CNT_STATE')
+    selected_state = None
+    if state_options:
+        available_states = ['All'] + state_options
+        selected_state = state_slot.selectbox("Select State", available_states)
+        if selected_state == 'All':
+            selected_state = None
+        elif not roster_db:
+            with instrument('filter by state', rows_in=len(roster_df)) as record:
+                roster_df = roster_index.select(CNT_STATE=selected_state)
+                record['rows_out'] = len(roster_df)
+    roster_key = (roster_version, roster_months, selected_state)
+    roster_query = {'months': roster_months, 'state': selected_state}
+    
+    # Distinct organizations, rosters and source systems in the roster
+    # filter, merged from per-part sketches instead of hashing every row
+    if roster_version is not None:
+        with instrument('load distinct counts', cached=True):
+            distinct_sketches = get_distinct_counts(ROSTER_CSV).get(roster_version)
+        distinct = cached_view(('distinct',) + roster_key,
+                               lambda: count_distinct(distinct_sketches, roster_months,
+                                                      selected_state))
+        for column, (col, label) in zip(st.columns(len(DISTINCT_COLUMNS)),
+                                        DISTINCT_COLUMNS.items()):
+            count, exact = distinct[col]
+            column.metric(label, f"{count:,}" if exact else f"≈{count:,}",
+                          help=None if exact else "HyperLogLog estimate (about ±1.6%)")
+    
     # Row 2: Processing stages and duration analysis
     st.markdown("---")
     st.subheader("⚙️ Processing Stage Analysis")
@@ -553,16 +3367,36 @@ def main():
     col1, col2 = st.columns(2)
     
     with col1:
-        stage_chart = create_processing_stage_chart(roster_df)
+        stage_chart = cached_chart(
+            ('stages',) + roster_key,
+            lambda: create_processing_stage_chart(
+                roster_df, roster_db.stage_distribution(**roster_query) if roster_db else None
+            )
+        )
         if stage_chart:
-            st.plotly_chart(stage_chart, use_container_width=True)
+            render_chart(stage_chart, 'Processing stages')
         else:
             st.info("Processing stage data not available")
     
     with col2:
-        duration_chart = create_duration_analysis(roster_df)
+        # Raw points only while they fit the budget
+        if roster_db:
+            duration_rows = cached_view(('roster rows',) + roster_key,
+                                        lambda: roster_db.count(**roster_query))
+        else:
+            duration_rows = len(roster_df)
+        duration_summary = duration_rows * len(DURATION_STAGES) > FIGURE_POINT_BUDGET
+        if roster_db and duration_summary:
+            # Box statistics computed by SQLite; no duration rows are fetched
+            build_durations = lambda: create_duration_analysis(
+                None, stats=roster_db.duration_quantiles(**roster_query))
+        elif roster_db:
+            build_durations = lambda: create_duration_analysis(roster_db.durations(**roster_query))
+        else:
+            build_durations = partial(create_duration_analysis, roster_df, summary=duration_summary)
+        duration_chart = cached_chart(('durations',) + roster_key, build_durations)
         if duration_chart:
-            st.plotly_chart(duration_chart, use_container_width=True)
+            render_chart(duration_chart, 'Stage durations')
         else:
             st.info("Duration data not available")
     
@@ -571,25 +3405,39 @@ def main():
     st.subheader("🔴 Failed Roster Analysis")
     
     tab1, tab2, tab3 = st.tabs(["By State", "By Organization", "By Line of Business"])
+    failure_ranking = cached_view(
+        ('failure ranking',) + roster_key,
+        lambda: (roster_db.rank_failures(FAILURE_DIMENSIONS, 10, **roster_query) if roster_db
+                 else rank_failures(roster_df, FAILURE_DIMENSIONS, 10))
+    )
     
     with tab1:
-        failures_state = create_top_failures_chart(roster_df, 'CNT_STATE', 10)
+        failures_state = cached_chart(
+            ('failures', 'CNT_STATE') + roster_key,
+            lambda: create_top_failures_chart(roster_df, 'CNT_STATE', 10, failure_ranking)
+        )
         if failures_state:
-            st.plotly_chart(failures_state, use_container_width=True)
+            render_chart(failures_state, 'Failures by state')
         else:
             st.success("✅ No failed rosters by state")
     
     with tab2:
-        failures_org = create_top_failures_chart(roster_df, 'ORG_NM', 10)
+        failures_org = cached_chart(
+            ('failures', 'ORG_NM') + roster_key,
+            lambda: create_top_failures_chart(roster_df, 'ORG_NM', 10, failure_ranking)
+        )
         if failures_org:
-            st.plotly_chart(failures_org, use_container_width=True)
+            render_chart(failures_org, 'Failures by organization')
         else:
             st.success("✅ No failed rosters by organization")
     
     with tab3:
-        failures_lob = create_top_failures_chart(roster_df, 'LOB', 10)
+        failures_lob = cached_chart(
+            ('failures', 'LOB') + roster_key,
+            lambda: create_top_failures_chart(roster_df, 'LOB', 10, failure_ranking)
+        )
         if failures_lob:
-            st.plotly_chart(failures_lob, use_container_width=True)
+            render_chart(failures_lob, 'Failures by LOB')
         else:
             st.success("✅ No failed rosters by Line of Business")
     
@@ -597,26 +3445,173 @@ def main():
     st.markdown("---")
     st.subheader("📋 Failed Roster Details")
     
-    failure_table = create_failure_details_table(roster_df, limit=50)
-    if not failure_table.empty:
+    col1, col2, col3, col4 = st.columns([2, 1, 3, 1])
+    sort_by = col1.selectbox("Sort by", list(FAILURE_SORT_COLUMNS),
+                             format_func=FAILURE_SORT_COLUMNS.get)
+    ascending = col2.selectbox("Order", ["Descending", "Ascending"]) == "Ascending"
+    statuses = tuple(col3.multiselect(
+        "Failure status",
+        cached_view(('failure statuses',) + roster_key,
+                    lambda: (roster_db.failure_statuses(**roster_query) if roster_db
+                             else failure_statuses(roster_df)))
+    ))
+    page_size = col4.selectbox("Rows per page", FAILURE_PAGE_SIZES, index=1)
+    
+    failure_key = roster_key + (sort_by, ascending, statuses)
+    if roster_db:
+        # The database sorts and pages; only the count and pages are cached
+        failure_total = cached_view(('failure count',) + roster_key + (statuses,),
+                                    lambda: roster_db.failure_count(statuses, **roster_query))
+        fetch_page = partial(roster_db.failure_page, sort_by, ascending, statuses,
+                             page_size=page_size, **roster_query)
+        export_chunks = partial(roster_db.failure_chunks, sort_by, ascending, statuses,
+                                **roster_query)
+    else:
+        # The sorted positions are cached per filter state; a page is a slice
+        failure_rows = cached_view(
+            ('failure order',) + failure_key,
+            lambda: failure_order(roster_df, sort_by, ascending, statuses)
+        )
+        failure_total = len(failure_rows)
+        fetch_page = partial(failure_page, roster_df, failure_rows, page_size=page_size)
+        export_chunks = partial(failure_chunks, roster_df, failure_rows)
+    if failure_total > 0:
+        page_count = -(-failure_total // page_size)
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1) - 1
         st.dataframe(
-            failure_table,
+            cached_view(('failure page',) + failure_key + (page, page_size),
+                        lambda: fetch_page(page)),
             use_container_width=True,
             height=400,
             hide_index=True
         )
+        first = page * page_size + 1
+        last = min((page + 1) * page_size, failure_total)
+        st.caption(f"Rows {first:,}-{last:,} of {failure_total:,} failed rosters "
+                   f"(page {page + 1:,} of {page_count:,})")
         
-        # Download button
-        csv = failure_table.to_csv(index=False)
-        st.download_button(
-            label="⬇️ Download Failed Roster Details (CSV)",
-            data=csv,
-            file_name=f"failed_rosters_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
+        # Export every matching row, not just the visible page
+        export_format = st.radio("Export format", ["CSV", "Parquet"], horizontal=True)
+        if st.button(f"📦 Prepare export of all {failure_total:,} rows"):
+            write_export, mime = {
+                'CSV': (write_failures_csv, "text/csv"),
+                'Parquet': (write_failures_parquet, "application/octet-stream"),
+            }[export_format]
+            try:
+                # Chunks are spooled to disk as they are written; Streamlit
+                # then holds one copy of the finished file to serve it. Each
+                # write is a whole chunk, so the file needs no buffering (and
+                # download_button takes raw files, not buffered random access)
+                with tempfile.TemporaryFile(buffering=0) as export_file:
+                    with instrument('export failures', rows_in=failure_total):
+                        write_export(export_chunks(), export_file)
+                        export_file.seek(0)
+                    st.download_button(
+                        label=f"⬇️ Download Failed Roster Details ({export_format})",
+                        data=export_file,
+                        file_name=f"failed_rosters_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                                  f".{export_format.lower()}",
+                        mime=mime
+                    )
+            except ImportError as e:
+                st.error(f"Parquet export needs pyarrow: {e}")
     else:
         st.success("✅ No failed rosters found in the filtered data!")
     
+    # The retry-chain and latency indexes are built from the roster source;
+    # skip them when there is none
+    if roster_version is not None:
+        # Row 5: Retry chains - what happened to each roster across its runs
+        st.markdown("---")
+        st.subheader("🔁 Retry Chains & Recovery")
+        
+        with st.spinner("Indexing retry chains..."):
+            with instrument('load retry chains', cached=True) as record:
+                chains = get_retry_chains(ROSTER_CSV).get(roster_version)
+                record['rows_out'] = len(chains)
+        # Filtered by the month of each roster's first run and its latest state
+        chains = select_summary(chains, roster_months, selected_state)
+        recovery = cached_view(('recovery summary',) + roster_key, lambda: recovery_summary(chains))
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🧾 Failed First Run", f"{recovery['failed_first_run']:,}")
+        col2.metric("🔄 Recovered on Retry", f"{recovery['recovery_rate']:.2f}%")
+        col3.metric("⏱️ Median Time to Recovery",
+                    "n/a" if pd.isna(recovery['median_recovery_hours'])
+                    else f"{recovery['median_recovery_hours']:.1f} h")
+        col4.metric("🚨 Still Failing", f"{recovery['still_failing']:,}")
+        
+        tab1, tab2 = st.tabs(["Recovery by State", "Recovery by Organization"])
+        for tab, group_by, name in [(tab1, 'CNT_STATE', 'Recovery by state'),
+                                    (tab2, 'ORG_NM', 'Recovery by organization')]:
+            with tab:
+                recovery_chart = cached_chart(
+                    ('recovery', group_by) + roster_key,
+                    lambda: create_recovery_chart(recovery_rates(chains, group_by), group_by)
+                )
+                if recovery_chart:
+                    render_chart(recovery_chart, name)
+                else:
+                    st.success("✅ No rosters failed their first run")
+        
+        min_runs = st.number_input("Still failing after at least N runs",
+                                   min_value=1, value=2, key='min_runs')
+        stuck = cached_view(('still failing',) + roster_key + (min_runs,),
+                            lambda: still_failing(chains, min_runs))
+        if len(stuck):
+            st.dataframe(stuck.head(FAILURE_PAGE_SIZES[-1]), use_container_width=True,
+                         height=300, hide_index=True)
+            st.caption(f"{len(stuck):,} rosters still failing after {min_runs}+ runs"
+                       + (f" (first {FAILURE_PAGE_SIZES[-1]:,} shown)"
+                          if len(stuck) > FAILURE_PAGE_SIZES[-1] else ""))
+        else:
+            st.success(f"✅ No rosters still failing after {min_runs}+ runs")
+        
+        # Row 6: Stage latency SLOs - percentiles merged from duration sketches
+        st.markdown("---")
+        st.subheader("⏱️ Stage Latency SLOs")
+        
+        with st.spinner("Indexing stage durations..."):
+            with instrument('load duration sketches', cached=True) as record:
+                sketch = get_duration_sketches(ROSTER_CSV).get(roster_version)
+                record['rows_out'] = sum(len(cells) for cells in sketch.values())
+        sketch = select_sketches(sketch, roster_months, selected_state)
+        latency = cached_view(('latency',) + roster_key, lambda: sketch_quantiles(sketch))
+        if latency.empty:
+            st.info("Duration data not available")
+        else:
+            st.dataframe(latency.round(2), use_container_width=True, hide_index=True)
+        
+            col1, col2, col3 = st.columns(3)
+            slo_stage = col1.selectbox("SLO stage", list(DURATION_STAGES),
+                                       format_func=DURATION_STAGES.get)
+            slo_by = col2.selectbox("Break down by", list(SLO_DIMENSIONS),
+                                    format_func=SLO_DIMENSIONS.get)
+            slo_target = col3.number_input("p95 target (min)", min_value=0.0, step=1.0,
+                                           value=float(STAGE_SLO_MINUTES[slo_stage]),
+                                           key=f'slo_target_{slo_stage}')
+            slo = cached_view(('stage slo',) + roster_key + (slo_stage, slo_by),
+                              lambda: stage_slo(sketch, slo_by, slo_stage))
+            meets = (slo['p95'] <= slo_target).to_numpy()
+            st.caption(f"{meets.sum():,} of {len(slo):,} {SLO_DIMENSIONS[slo_by].lower()} groups "
+                       f"meet p95 ≤ {slo_target:g} min for {DURATION_STAGES[slo_stage]}")
+        
+            slo_chart = cached_chart(
+                ('slo chart',) + roster_key + (slo_stage, slo_by, slo_target),
+                lambda: create_slo_chart(slo, slo_by, slo_target)
+            )
+            if slo_chart:
+                render_chart(slo_chart, 'Stage latency SLO')
+            st.dataframe(slo.assign(**{'Meets SLO': meets}).round(2),
+                         use_container_width=True, height=300, hide_index=True)
+    
+    render_payload_report()
+    
+    records = finish_perf_run()
+    export_perf_records(records)
+    if st.sidebar.checkbox("🛠️ Show performance panel", key='perf_panel'):
+        render_perf_panel(records)
+    
     # Footer
     st.markdown("---")
     st.markdown(
@@ -0,0 +1,262 @@
+"""
+Headless benchmark for the Roster Dashboard pipeline
+Runs the loaders, KPI computation and every chart builder from app.py
+outside Streamlit against synthetic data, reporting wall time, peak memory
+and figure payload size per stage.
+
+Usage:
+    python benchmark.py                          # 10k, 1M and 10M rows
+    python benchmark.py --rows 10000 100000      # custom sizes
+    python benchmark.py --compare benchmark_results/previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+import app
+import generate_data
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+RESULTS_DIR = 'benchmark_results'
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def _rows(value):
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    return None
+
+
+def measure(results, stage, fn, rows_in=None, track_memory=True):
+    """Run ``fn()``, record its wall time, peak memory and output size under ``stage``"""
+    if track_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    value = fn()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+    if track_memory:
+        tracemalloc.stop()
+
+    entry = {
+        'seconds': round(seconds, 6),
+        'peak_mb': None if peak is None else round(peak / 1e6, 3),
+        'rows_in': rows_in,
+        'rows_out': _rows(value),
+    }
+    if value is not None and hasattr(value, 'to_json') and hasattr(value, 'data'):
+        chart = app.prepare_chart(value)
+        entry['points'] = chart.points
+        entry['payload_bytes'] = chart.bytes
+    results[stage] = entry
+    print(f"  {stage:<40} {seconds:>9.3f}s"
+          + ('' if peak is None else f" {peak / 1e6:>9.1f} MB")
+          + (f" {entry['payload_bytes'] / 1024:>9.1f} KB" if 'payload_bytes' in entry else ''))
+    return value
+
+
+def exact_quantiles(roster_df, by=None, stages=None):
+    """SLO_QUANTILES per stage (and per ``by`` value) from the rows, to compare the sketches with"""
+    frames = []
+    for stage in stages or app.DURATION_STAGES:
+        values = roster_df.loc[roster_df[stage] > 0, ([by] if by else []) + [stage]]
+        grouped = values.groupby(by, observed=True)[stage] if by else values[stage]
+        quantiles = grouped.quantile(list(app.SLO_QUANTILES.values()))
+        frames.append(quantiles.unstack() if by else quantiles.to_frame().T)
+    return pd.concat(frames)
+
+
+def run_size(rows, data_dir, track_memory=True):
+    """Benchmark every pipeline stage at one dataset size"""
+    roster_path = os.path.join(data_dir, f'roster_{rows}.csv')
+    metrics_path = os.path.join(data_dir, f'metrics_{rows}.csv')
+    if not os.path.exists(roster_path):
+        print(f"  generating {rows:,} roster rows...")
+        generate_data.write_roster_csv(roster_path, rows)
+    if not os.path.exists(metrics_path):
+        print(f"  generating {rows:,} metrics rows...")
+        generate_data.write_metrics_csv(metrics_path, rows)
+
+    # Always start from an empty columnar cache so 'cold' means cold
+    app.CACHE_DIR = os.path.join(data_dir, f'cache_{rows}')
+    shutil.rmtree(app.CACHE_DIR, ignore_errors=True)
+
+    results = {}
+    load_metrics = app.load_aggregated_metrics.__wrapped__
+    load_roster = app.load_roster_processing_details.__wrapped__
+
+    agg_df = measure(results, 'load_aggregated_metrics',
+                     lambda: load_metrics(metrics_path), rows, track_memory)
+    cube = measure(results, 'build_metrics_cube',
+                   lambda: app.MetricsCube(agg_df), len(agg_df), track_memory)
+    measure(results, 'load_roster (cold)',
+            lambda: load_roster(roster_path), rows, track_memory)
+    roster_df = measure(results, 'load_roster (cached)',
+                        lambda: load_roster(roster_path), rows, track_memory)
+    month = app.month_keys(roster_df).max() if len(roster_df) else app.UNKNOWN_MONTH
+    measure(results, 'load_roster (cached, one month)',
+            lambda: load_roster(roster_path, None, (month,)), rows, track_memory)
+    index = measure(results, 'build_filter_index',
+                    lambda: app.FilterIndex(roster_df, app.ROSTER_INDEX_COLUMNS),
+                    len(roster_df), track_memory)
+    state = index.options('CNT_STATE')[0] if index.options('CNT_STATE') else None
+    filtered = measure(results, 'filter_by_state',
+                       lambda: index.select(CNT_STATE=state), len(roster_df), track_memory)
+
+    n = len(roster_df)
+    measure(results, 'compute_kpis',
+            lambda: app.compute_kpis(cube, roster_df), n, track_memory)
+    distinct = measure(results, 'distinct_counts',
+                       lambda: app.DistinctCounts(roster_path).get(), n, track_memory)
+    measure(results, 'compute_kpis (distinct sketches)',
+            lambda: app.compute_kpis(cube, distinct=app.count_distinct(distinct)),
+            n, track_memory)
+    measure(results, 'count_distinct (state)',
+            lambda: app.count_distinct(distinct, state=state), n, track_memory)
+    measure(results, 'create_monthly_trend',
+            lambda: app.create_monthly_trend(cube), len(agg_df), track_memory)
+    measure(results, 'create_first_vs_next_iter',
+            lambda: app.create_first_vs_next_iter(cube), len(agg_df), track_memory)
+    measure(results, 'create_processing_stage_chart',
+            lambda: app.create_processing_stage_chart(roster_df), n, track_memory)
+    measure(results, 'create_duration_analysis',
+            lambda: app.create_duration_analysis(
+                roster_df, summary=n * len(app.DURATION_STAGES) > app.FIGURE_POINT_BUDGET
+            ), n, track_memory)
+    ranking = measure(results, 'rank_failures',
+                      lambda: app.rank_failures(roster_df, app.FAILURE_DIMENSIONS, 10),
+                      n, track_memory)
+    for group_by in app.FAILURE_DIMENSIONS:
+        measure(results, f'create_top_failures_chart ({group_by})',
+                lambda: app.create_top_failures_chart(roster_df, group_by, 10, ranking),
+                n, track_memory)
+    chains = measure(results, 'retry_chains',
+                     lambda: app.RetryChains(roster_path).get(), n, track_memory)
+    measure(results, 'recovery_rates (ORG_NM)',
+            lambda: app.recovery_rates(chains, 'ORG_NM'), len(chains), track_memory)
+    measure(results, 'still_failing',
+            lambda: app.still_failing(chains, 2), len(chains), track_memory)
+    sketch = measure(results, 'duration_sketches',
+                     lambda: app.DurationSketches(roster_path).get(), n, track_memory)
+    # The sketches against the duration and key columns they summarize
+    cells = sum(len(frame) for frame in sketch.values())
+    sketch_mb = sum(frame.memory_usage(deep=True).sum() for frame in sketch.values()) / 1e6
+    source = [c for c in list(app.DURATION_STAGES) + app.SKETCH_DIMENSIONS + list(app.SKETCH_ACCURACY)
+              if c in roster_df.columns]
+    source_mb = roster_df[list(dict.fromkeys(source))].memory_usage(deep=True).sum() / 1e6
+    results['duration_sketches'].update(rows_out=cells, sketch_mb=round(sketch_mb, 3),
+                                        source_mb=round(source_mb, 3))
+    print(f"    {cells:,} sketch cells, {sketch_mb:.1f} MB vs {source_mb:.1f} MB of source columns")
+    measure(results, 'sketch_quantiles',
+            lambda: app.sketch_quantiles(sketch), cells, track_memory)
+    measure(results, 'sketch_quantiles (exact)',
+            lambda: exact_quantiles(roster_df), n, track_memory)
+    for by in app.SLO_DIMENSIONS:
+        measure(results, f'stage_slo ({by})',
+                lambda: app.stage_slo(sketch, by, 'SPS_LOAD_DURATION'), len(sketch[by]), track_memory)
+        measure(results, f'stage_slo (exact, {by})',
+                lambda: exact_quantiles(roster_df, by, ['SPS_LOAD_DURATION']), n, track_memory)
+    measure(results, 'create_failure_details_table',
+            lambda: app.create_failure_details_table(roster_df, limit=50), n, track_memory)
+    measure(results, 'create_failure_details_table (state)',
+            lambda: app.create_failure_details_table(filtered, limit=50),
+            len(filtered), track_memory)
+    
+    # Optional SQLite backend: build once, then the same views as queries
+    sqlite_roster = measure(results, 'build_sqlite_roster',
+                            lambda: app.load_sqlite_roster.__wrapped__(roster_path),
+                            rows, track_memory)
+    sqlite_metrics = measure(results, 'build_sqlite_metrics',
+                             lambda: app.load_sqlite_metrics.__wrapped__(metrics_path),
+                             len(agg_df), track_memory)
+    measure(results, 'compute_kpis (sqlite)',
+            lambda: app.compute_kpis(sqlite_metrics), len(agg_df), track_memory)
+    measure(results, 'stage_distribution (sqlite)',
+            lambda: sqlite_roster.stage_distribution(), n, track_memory)
+    measure(results, 'duration_quantiles (sqlite)',
+            lambda: sqlite_roster.duration_quantiles(), n, track_memory)
+    measure(results, 'rank_failures (sqlite)',
+            lambda: sqlite_roster.rank_failures(app.FAILURE_DIMENSIONS, 10), n, track_memory)
+    measure(results, 'failure_page (sqlite)',
+            lambda: sqlite_roster.failure_page(page_size=50), n, track_memory)
+    measure(results, 'failure_page (sqlite, state)',
+            lambda: sqlite_roster.failure_page(page_size=50, state=state), n, track_memory)
+    return results
+
+
+def compare(current, previous):
+    """Print per-stage time ratios against an earlier results file"""
+    print("\nComparison (current / previous wall time):")
+    for rows, stages in current['results'].items():
+        old_stages = previous['results'].get(rows)
+        if not old_stages:
+            continue
+        print(f"  {int(rows):,} rows")
+        for stage, entry in stages.items():
+            old = old_stages.get(stage)
+            if not old or not old['seconds']:
+                continue
+            ratio = entry['seconds'] / old['seconds']
+            flag = '  <-- slower' if ratio > 1.2 else ''
+            print(f"    {stage:<40} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS,
+                        help='dataset sizes to benchmark (default: 10k 1M 10M)')
+    parser.add_argument('--data-dir', default=None,
+                        help='where synthetic CSVs are written and reused (default: temp dir)')
+    parser.add_argument('--out', default=None,
+                        help=f'results JSON path (default: {RESULTS_DIR}/bench_<timestamp>.json)')
+    parser.add_argument('--compare', default=None,
+                        help='earlier results JSON to compare against')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip tracemalloc (faster, no peak memory figures)')
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='roster_bench_')
+    os.makedirs(data_dir, exist_ok=True)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'results': {},
+    }
+    for rows in args.rows:
+        print(f"\n{rows:,} rows")
+        report['results'][str(rows)] = run_size(rows, data_dir, not args.no_memory)
+
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+    if not args.data_dir:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Synthetic data generator for the Roster Dashboard
+Writes schema-faithful roster_processing_details.csv and
+aggregated_operational_metrics.csv files of any size, streaming to disk in
+chunks so even 50M-row files never have to fit in memory.
+
+Usage:
+    python generate_data.py                                  # 100k roster rows
+    python generate_data.py --roster-rows 50000000 --metrics-rows 100000
+    python generate_data.py --out-dir data --seed 7
+
+Files go to ./synthetic_data unless --out-dir says otherwise, so the CSVs
+shipped in the project root are never overwritten by accident.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 500_000
+DEFAULT_OUT_DIR = 'synthetic_data'
+# Both files cover the months up to and including this one
+END_MONTH = '2025-12'
+STATES = ['CA', 'TX', 'FL', 'NY', 'PA', 'IL', 'OH', 'GA', 'NC', 'MI',
+          'NJ', 'VA', 'WA', 'AZ', 'MA', 'TN', 'IN', 'MO', 'MD', 'WI',
+          'CO', 'MN', 'SC', 'AL', 'LA', 'KY', 'OR', 'OK', 'CT', 'UT',
+          'NV', 'IA', 'AR', 'MS', 'KS', 'NM', 'NE', 'ID', 'WV', 'HI']
+LOBS = ['Medicare', 'Medicaid', 'Commercial']
+LOB_WEIGHTS = [0.45, 0.35, 0.20]
+SOURCE_SYSTEMS = ['AvailityPDM', 'Demographic', 'ProviderPortal', 'SFTP']
+SOURCE_WEIGHTS = [0.50, 0.30, 0.15, 0.05]
+# Processing stages in pipeline order, with their duration columns
+STAGES = ['PRE_PROCESSING', 'ISF_GEN', 'DART_GEN', 'SPS_LOAD']
+STAGE_MEAN_MINUTES = [5.0, 12.0, 4.0, 25.0]
+FAILURE_STATUSES = ['Validation Error', 'Timeout', 'Schema Mismatch', 'Load Error']
+# Roster-level behaviour
+ORG_COUNT = 5_000
+FIRST_RUN_FAIL_RATE = 0.18
+RETRY_FAIL_RATE = 0.35
+MAX_RUNS = 6
+STUCK_RATE = 0.03
+
+
+# ============================================================================
+# ROSTER PROCESSING DETAILS
+# ============================================================================
+
+def _org_pool(rng):
+    """Organization names with a home state each; popularity is Zipf-skewed"""
+    state_weights = 1.0 / np.arange(1, len(STATES) + 1) ** 0.8
+    states = rng.choice(STATES, ORG_COUNT, p=state_weights / state_weights.sum())
+    names = np.array([f'Provider Group {i:05d}' for i in range(ORG_COUNT)], dtype=object)
+    return names, states
+
+
+def _roster_chunk(rng, orgs, first_roster, rosters, start, end):
+    """
+    Runs for ``rosters`` roster objects received between ``start`` and
+    ``end``. Each roster gets run 1 plus a retry after every failed run, up
+    to MAX_RUNS, so RO_ID / RUN_NO chains are consistent.
+    """
+    org_names, org_states = orgs
+    # Zipf-skewed organization per roster
+    org = (rng.zipf(1.3, rosters) - 1) % ORG_COUNT
+
+    # Runs per roster: retry while the previous run failed
+    fail_first = rng.random(rosters) < FIRST_RUN_FAIL_RATE
+    retries = np.minimum(rng.geometric(1 - RETRY_FAIL_RATE, rosters), MAX_RUNS - 1)
+    runs = np.where(fail_first, 1 + retries, 1)
+    # The last allowed run can still fail
+    final_failed = fail_first & (runs == MAX_RUNS) & (rng.random(rosters) < RETRY_FAIL_RATE)
+
+    roster_of_run = np.repeat(np.arange(rosters), runs)
+    n = len(roster_of_run)
+    run_starts = np.cumsum(runs) - runs
+    run_no = np.arange(n) - np.repeat(run_starts, runs) + 1
+    is_last = run_no == runs[roster_of_run]
+    is_failed = (~is_last | final_failed[roster_of_run]).astype(np.int8)
+
+    received = pd.to_datetime(
+        rng.integers(start.value // 10**9, end.value // 10**9, rosters), unit='s'
+    )
+    # Retries follow the previous run by a few hours
+    run_offset = pd.to_timedelta(
+        (run_no - 1) * rng.integers(1, 12, n) * 3600 + rng.integers(60, 3600, n), unit='s'
+    )
+    run_dt = received[roster_of_run] + run_offset
+
+    # Failed runs stop at a stage; later stages have no duration
+    failed_stage = rng.integers(0, len(STAGES), n)
+    reached = np.where(is_failed == 1, failed_stage, len(STAGES) - 1)
+    durations = {}
+    for i, (stage, mean) in enumerate(zip(STAGES, STAGE_MEAN_MINUTES)):
+        values = rng.lognormal(np.log(mean), 0.6, n).round(2)
+        durations[f'{stage}_DURATION'] = np.where(reached >= i, values, 0.0)
+    total_minutes = sum(durations.values())
+
+    tot_rec = rng.integers(50, 50_000, n)
+    fail_share = np.where(is_failed == 1, rng.beta(2, 5, n), rng.beta(1, 60, n))
+    fail_rec = (tot_rec * fail_share).astype(np.int64)
+    skip_rec = (tot_rec * rng.beta(1, 100, n)).astype(np.int64)
+    rej_rec = (tot_rec * rng.beta(1, 200, n)).astype(np.int64)
+    scs_rec = np.maximum(tot_rec - fail_rec - skip_rec - rej_rec, 0)
+    scs_pct = (scs_rec / tot_rec * 100).round(2)
+
+    def health(pct):
+        return np.where(pct >= 95, 'Green', np.where(pct >= 80, 'Amber', 'Red'))
+
+    stage_names = np.array(STAGES + ['RESOLVED'], dtype=object)
+    latest_stage = np.where(is_failed == 1, stage_names[reached], 'RESOLVED')
+    is_stuck = ((is_failed == 0) & (rng.random(n) < STUCK_RATE)).astype(np.int8)
+    latest_stage = np.where(is_stuck == 1, stage_names[rng.integers(0, len(STAGES), n)], latest_stage)
+
+    first_id = first_roster * MAX_RUNS
+    roster_ids = first_roster + roster_of_run
+    creat_dt = run_dt
+    last_updt_dt = run_dt + pd.to_timedelta(total_minutes * 60, unit='s')
+
+    return pd.DataFrame({
+        'ID': first_id + np.arange(1, n + 1),
+        'RO_ID': [f'RO{i:010d}' for i in roster_ids],
+        'RA_FILE_DETAILS_ID': 1_000_000 + roster_ids,
+        'RA_ROSTER_DETAILS_ID': 2_000_000 + org[roster_of_run],
+        'RA_PLM_RO_PROF_DATA_ID': 3_000_000 + roster_ids * 10 + run_no,
+        'SRC_SYS': rng.choice(SOURCE_SYSTEMS, n, p=SOURCE_WEIGHTS),
+        'ORG_NM': org_names[org][roster_of_run],
+        'CNT_STATE': org_states[org][roster_of_run],
+        'LOB': rng.choice(LOBS, rosters, p=LOB_WEIGHTS)[roster_of_run],
+        'RUN_NO': run_no,
+        'TOT_REC_CNT': tot_rec,
+        'SCS_REC_CNT': scs_rec,
+        'FAIL_REC_CNT': fail_rec,
+        'SKIP_REC_CNT': skip_rec,
+        'REJ_REC_CNT': rej_rec,
+        'SCS_PCT': scs_pct,
+        'IS_FAILED': is_failed,
+        'IS_STUCK': is_stuck,
+        'FAILURE_STATUS': np.where(is_failed == 1, rng.choice(FAILURE_STATUSES, n), ''),
+        'FILE_STATUS_CD': np.where(is_failed == 1, 99, np.where(is_stuck == 1, 50, 0)),
+        'LATEST_STAGE_NM': latest_stage,
+        **durations,
+        'PRE_PROCESSING_HEALTH': health(100 - fail_share * 50),
+        'ISF_GEN_HEALTH': health(100 - fail_share * 80),
+        'DART_GEN_HEALTH': health(100 - fail_share * 90),
+        'SPS_LOAD_HEALTH': health(scs_pct),
+        'IS_ACTIVE': 1,
+        'FILE_RECEIVED_DT': received[roster_of_run],
+        'LATEST_OBJECT_RUN_DT': run_dt,
+        'CREAT_DT': creat_dt,
+        'CREAT_USER_ID': 'SYSTEM',
+        'LAST_UPDT_DT': last_updt_dt,
+        'LAST_UPDT_USER_ID': 'SYSTEM',
+    })
+
+
+def write_roster_csv(path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS,
+                     months=12, end_month=END_MONTH):
+    """
+    Stream ``rows`` roster processing runs received in the ``months``
+    months ending with ``end_month`` to ``path``.
+
+    Chunks cover consecutive time windows of that span, so the file is
+    roughly in arrival order like the upstream export.
+    """
+    rng = np.random.default_rng(seed)
+    orgs = _org_pool(rng)
+    last = pd.Period(end_month, freq='M')
+    start, end = (last - months + 1).to_timestamp(), (last + 1).to_timestamp()
+    chunks = max(1, -(-rows // chunk_rows))
+    window = (end - start) / chunks
+    # Rosters average a little over one run each
+    runs_per_roster = 1 + FIRST_RUN_FAIL_RATE / (1 - RETRY_FAIL_RATE)
+
+    written = 0
+    next_roster = 0
+    for i in range(chunks):
+        target = min(chunk_rows, rows - written)
+        # Oversample slightly, and again if the retries came up short, so
+        # the chunk always reaches its row target
+        rosters = int(target / runs_per_roster * 1.05) + 1
+        while True:
+            chunk = _roster_chunk(rng, orgs, next_roster, rosters,
+                                  start + window * i, start + window * (i + 1))
+            if len(chunk) >= target:
+                break
+            rosters = int(rosters * 1.1) + 1
+        # A chain cut at the row limit reads as a roster still being retried
+        chunk = chunk.head(target)
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        written += len(chunk)
+        next_roster += rosters
+    return written
+
+
+# ============================================================================
+# AGGREGATED OPERATIONAL METRICS
+# ============================================================================
+
+def write_metrics_csv(path, rows, seed=0, months=12, end_month=END_MONTH,
+                      chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Stream about ``rows`` month x market x client metric rows for the
+    ``months`` months ending with ``end_month`` to ``path``, with MONTH in
+    MM-YYYY format. Markets are states; clients are added until the
+    requested row count is reached.
+    """
+    rng = np.random.default_rng(seed + 1)
+    periods = pd.period_range(end=end_month, periods=months, freq='M')
+    clients = max(1, -(-rows // (months * len(STATES))))
+    # Market size is skewed like the real book of business
+    market_scale = 1.0 / np.arange(1, len(STATES) + 1) ** 1.1
+
+    # Month varies fastest in the client x market x month grid, so cutting
+    # it at ``rows`` drops clients and markets, never the newest months.
+    # Rows go out in month, market, client order; only the number of
+    # clients each month x market cell keeps is materialized.
+    cell = np.arange(len(periods) * len(STATES))
+    month_of_cell, market_of_cell = np.divmod(cell, len(STATES))
+    first = market_of_cell * len(periods) + month_of_cell
+    span = len(STATES) * len(periods)
+    counts = np.clip(-(-(rows - first) // span), 0, clients)
+    cell_end = np.cumsum(counts)
+    cell_start = cell_end - counts
+    total = int(cell_end[-1])
+
+    written = 0
+    for offset in range(0, total, chunk_rows):
+        position = np.arange(offset, min(offset + chunk_rows, total))
+        n = len(position)
+        cells = np.searchsorted(cell_end, position, side='right')
+        month = month_of_cell[cells]
+        market = market_of_cell[cells]
+        client = position - cell_start[cells] + 1
+        volume = (rng.lognormal(13, 1.0, n) * market_scale[market]).astype(np.int64) + 100
+        first_fail = (volume * rng.beta(2, 60, n)).astype(np.int64)
+        first_scs = volume - first_fail
+        recovered = (first_fail * rng.uniform(0.3, 0.9, n)).astype(np.int64)
+        next_scs = first_scs + recovered
+        next_fail = first_fail - recovered + (volume * rng.beta(1, 400, n)).astype(np.int64)
+        overall_scs = next_scs + (recovered * rng.uniform(0, 0.1, n)).astype(np.int64)
+        overall_fail = next_fail
+        created = (periods[month] + 1).to_timestamp() + pd.Timedelta('2D2h')
+
+        chunk = pd.DataFrame({
+            'ID': offset + np.arange(1, n + 1),
+            'MONTH': periods[month].strftime('%m-%Y'),
+            'MARKET': np.array(STATES)[market],
+            'CLIENT_ID': client.astype(str),
+            'FIRST_ITER_SCS_CNT': first_scs,
+            'FIRST_ITER_FAIL_CNT': first_fail,
+            'NEXT_ITER_SCS_CNT': next_scs,
+            'NEXT_ITER_FAIL_CNT': next_fail,
+            'OVERALL_SCS_CNT': overall_scs,
+            'OVERALL_FAIL_CNT': overall_fail,
+            'SCS_PERCENT': (overall_scs / (overall_scs + overall_fail) * 100).round(2),
+            'IS_ACTIVE': 1,
+            'CREAT_DT': created,
+            'CREAT_USER_ID': 'SYSTEM',
+            'LAST_UPDT_DT': created + pd.Timedelta('2D'),
+            'LAST_UPDT_USER_ID': 'SYSTEM',
+        })
+        chunk.to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+        written += n
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--roster-rows', type=int, default=100_000,
+                        help='roster processing runs to write (default: 100,000)')
+    parser.add_argument('--metrics-rows', type=int, default=1_000,
+                        help='aggregated metric rows to write (default: 1,000)')
+    parser.add_argument('--months', type=int, default=12,
+                        help=f'months of history in both files, ending {END_MONTH} (default: 12)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help='rows generated and written per chunk')
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR,
+                        help=f'output directory (default: {DEFAULT_OUT_DIR})')
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    roster_path = os.path.join(args.out_dir, 'roster_processing_details.csv')
+    metrics_path = os.path.join(args.out_dir, 'aggregated_operational_metrics.csv')
+
+    rows = write_roster_csv(roster_path, args.roster_rows, args.seed, args.chunk_rows,
+                            args.months)
+    print(f"✅ Wrote {rows:,} rows to {roster_path}")
+    rows = write_metrics_csv(metrics_path, args.metrics_rows, args.seed,
+                             args.months, chunk_rows=args.chunk_rows)
+    print(f"✅ Wrote {rows:,} rows to {metrics_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,18 @@ Quick validation test for Roster Dashboard
 Tests data loading and basic metric computation
 """
 
+import numpy as np
 import pandas as pd
+import pytest
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import api
+import app
+import generate_data
 
 def test_data_loading():
     """Test that CSV files can be loaded"""
@@ -79,6 +89,615 @@ def test_metrics_computation(agg_df):
         return False
 
 
+# Cached-ingest behaviour checks (run with pytest)
+
+@pytest.fixture
+def roster_csv(tmp_path, monkeypatch):
+    """A small generated roster CSV, with the Parquet cache under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / 'roster.csv')
+    generate_data.write_roster_csv(path, 2_000, seed=1, chunk_rows=500)
+    return path
+
+
+def _rows(df):
+    """Frame in a canonical row order with plain (non-categorical) columns"""
+    df = df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    return df.sort_values(['RO_ID', 'RUN_NO']).reset_index(drop=True)
+
+
+def _split_csv(path, head_rows):
+    """Truncate ``path`` to its header and first ``head_rows`` rows; return the rest"""
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    with open(path, 'wb') as f:
+        f.writelines(lines[:head_rows + 1])
+    return b''.join(lines[head_rows + 1:])
+
+
+def _append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_append_ingests_only_the_tail(roster_csv):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    tail = _split_csv(roster_csv, 1_500)
+    assert len(app.load_cached_frame(roster_csv, app.read_roster_csv)) == 1_500
+    
+    _append(roster_csv, tail)
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pd.testing.assert_frame_equal(_rows(df), expected)
+    meta = app._read_cache_meta(app._cache_dir(roster_csv))
+    assert len(meta['segments']) == 2
+    assert meta['offset'] == len(open(roster_csv, 'rb').read())
+
+
+def test_partial_last_line_waits_for_the_newline(roster_csv):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    tail = _split_csv(roster_csv, len(expected) - 2)
+    app.load_cached_frame(roster_csv, app.read_roster_csv)
+    
+    cut = tail.index(b'\n') + 5
+    _append(roster_csv, tail[:cut])
+    assert len(app.load_cached_frame(roster_csv, app.read_roster_csv)) == len(expected) - 1
+    _append(roster_csv, tail[cut:])
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pd.testing.assert_frame_equal(_rows(df), expected)
+
+
+@pytest.mark.parametrize('rewrite', [
+    # Same size and header, one LOB changed in place
+    lambda data: data.replace(b',Medicare,', b',Medicaid,', 1),
+    # Shorter file
+    lambda data: data[:data.index(b'\n', len(data) // 2) + 1],
+])
+def test_rewrite_falls_back_to_a_full_read(roster_csv, rewrite):
+    app.load_cached_frame(roster_csv, app.read_roster_csv)
+    with open(roster_csv, 'rb') as f:
+        data = f.read()
+    with open(roster_csv, 'wb') as f:
+        f.write(rewrite(data))
+    
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pd.testing.assert_frame_equal(_rows(df), _rows(app.read_roster_csv(roster_csv)))
+    assert len(app._read_cache_meta(app._cache_dir(roster_csv))['segments']) == 1
+
+
+def test_rows_appended_during_a_rebuild_are_ingested_once(roster_csv):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    tail = _split_csv(roster_csv, 1_000)
+    
+    def read_while_appending(source, names=None):
+        # A writer appends while the full rebuild is parsing
+        _append(roster_csv, tail)
+        return app.read_roster_csv(source, names)
+    
+    assert len(app.load_cached_frame(roster_csv, read_while_appending)) == 1_000
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pd.testing.assert_frame_equal(_rows(df), expected)
+
+
+def test_older_version_never_sees_newer_rows(roster_csv):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    tail = _split_csv(roster_csv, 1_500)
+    old = app.source_version(roster_csv)
+    app.load_cached_frame(roster_csv, app.read_roster_csv)
+    _append(roster_csv, tail)
+    
+    # A rerun still on the old snapshot, before and after the refresh ingests
+    assert len(app.ingest_roster(roster_csv, version=old)) == 1_500
+    assert len(app.load_cached_frame(roster_csv, app.read_roster_csv)) == len(expected)
+    assert len(app.ingest_roster(roster_csv, version=old)) == 1_500
+    new = app.source_version(roster_csv)
+    pd.testing.assert_frame_equal(_rows(app.ingest_roster(roster_csv, version=new)), expected)
+    assert app._read_cache_meta(app._cache_dir(roster_csv))['offset'] == new[0]
+
+
+def test_concurrent_updates_ingest_each_row_once(roster_csv):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    tail = _split_csv(roster_csv, 1_000)
+    app.load_cached_frame(roster_csv, app.read_roster_csv)
+    _append(roster_csv, tail)
+    # Half the tail is what an older snapshot saw
+    half = tail.index(b'\n', len(tail) // 2) + 1
+    middle = os.path.getsize(roster_csv) - len(tail) + half
+    
+    parsing = []
+    overlaps = []
+    
+    def slow_read(source, names=None):
+        # Parsing is slow enough that unserialized updates would overlap
+        parsing.append(source)
+        overlaps.append(len(parsing))
+        time.sleep(0.2)
+        parsing.remove(source)
+        return app.read_roster_csv(source, names)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        frames = list(pool.map(lambda end: app.load_cached_frame(roster_csv, slow_read, end=end),
+                               [middle, None, middle, None]))
+    assert max(overlaps) == 1
+    assert [len(df) for df in frames] == [1_000 + tail[:half].count(b'\n'), len(expected)] * 2
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pd.testing.assert_frame_equal(_rows(df), expected)
+    assert not [name for name in os.listdir(app.CACHE_DIR) if name.endswith('.lock')]
+
+
+def test_cached_parts_does_not_read_parts(roster_csv, monkeypatch):
+    expected = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    
+    def no_reads(*args, **kwargs):
+        raise AssertionError('a part was read')
+    monkeypatch.setattr(app.pd, 'read_parquet', no_reads)
+    keys = [key for key, _ in app.cached_parts(roster_csv, app.read_roster_csv)]
+    assert len(keys) == app.month_keys(expected).nunique()
+    assert None not in keys
+
+
+def test_unwritable_cache_still_serves_the_rows(roster_csv, monkeypatch):
+    expected = _rows(app.read_roster_csv(roster_csv))
+    
+    def fail(*args):
+        raise OSError('read-only')
+    monkeypatch.setattr(app, '_write_cache_meta', fail)
+    pd.testing.assert_frame_equal(_rows(app.load_cached_frame(roster_csv, app.read_roster_csv)),
+                                  expected)
+    parts = list(app.cached_parts(roster_csv, app.read_roster_csv))
+    assert [key for key, _ in parts] == [None]
+    pd.testing.assert_frame_equal(_rows(parts[0][1]()), expected)
+
+
+def test_concat_compact_sorts_unified_categories():
+    frames = [pd.DataFrame({'ORG_NM': pd.Categorical(values)})
+              for values in (['Org C', 'Org A'], ['Org B', 'Org A'])]
+    df = app.concat_compact(frames)
+    assert list(df['ORG_NM'].cat.categories) == ['Org A', 'Org B', 'Org C']
+    assert list(df['ORG_NM']) == ['Org C', 'Org A', 'Org B', 'Org A']
+
+
+def test_memory_peaks_are_not_shared_between_concurrent_runs():
+    barrier = threading.Barrier(2)
+    peaks = {}
+    
+    def run(name, size):
+        app.start_perf_run(track_memory=True)
+        barrier.wait()
+        with app.instrument(name):
+            block = bytearray(size)
+            barrier.wait()
+            del block
+        peaks[name] = app.finish_perf_run()[0].get('peak_mb')
+    
+    threads = [threading.Thread(target=run, args=args) for args in [('a', 10**7), ('b', 3 * 10**7)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Neither run resets the peak the other is measuring
+    assert peaks == {'a': None, 'b': None}
+    assert not app.tracemalloc.is_tracing()
+    
+    app.start_perf_run(track_memory=True)
+    with app.instrument('alone'):
+        block = bytearray(10**7)
+        del block
+    assert app.finish_perf_run()[0]['peak_mb'] >= 10
+    assert not app.tracemalloc.is_tracing()
+
+
+def test_sqlite_roster_matches_pandas(roster_csv):
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    db = app.load_sqlite_roster.__wrapped__(roster_csv, app.source_version(roster_csv))
+    month = app.month_keys(df).max()
+    state = df['CNT_STATE'].astype(str).mode()[0]
+    for months, state in [(None, None), ((month,), None), (None, state), (('1999-01',), None)]:
+        subset = app.filter_months(df, months)
+        if state is not None:
+            subset = subset[subset['CNT_STATE'] == state]
+        assert db.count(months=months, state=state) == len(subset)
+        expected = app.duration_quantiles(subset)
+        actual = db.duration_quantiles(months=months, state=state)
+        if expected.empty:
+            assert actual.empty
+        else:
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-5)
+        expected = app.rank_failures(subset, app.FAILURE_DIMENSIONS, 10)
+        actual = db.rank_failures(app.FAILURE_DIMENSIONS, 10, months=months, state=state)
+        assert actual.keys() == expected.keys()
+        for col in expected:
+            assert actual[col]['Failure Count'].tolist() == expected[col]['Failure Count'].tolist()
+
+
+@pytest.mark.parametrize('by', [None, 'ORG_NM', 'CNT_STATE', 'LOB'])
+def test_sketch_quantiles_are_within_the_accuracy(roster_csv, by):
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    halves = [df.iloc[:len(df) // 2], df.iloc[len(df) // 2:]]
+    sketches = app.merge_sketches([app.sketch_durations(half) for half in halves])
+    accuracy = app.SKETCH_ACCURACY[by or 'CNT_STATE']
+    for stage, label in app.DURATION_STAGES.items():
+        values = df.loc[df[stage] > 0, ([by] if by else []) + [stage]]
+        groups = values.groupby(by, observed=True)[stage] if by else [(None, values[stage])]
+        report = app.sketch_quantiles(sketches, by)
+        report = report[report['Stage'] == label]
+        if by:
+            report = report.set_index(by)
+        for group, durations in groups:
+            row = report.loc[group] if by else report.iloc[0]
+            assert row['count'] == len(durations)
+            for name, q in app.SLO_QUANTILES.items():
+                exact = np.quantile(durations.to_numpy('float64'), q, method='lower')
+                assert abs(row[name] - exact) <= accuracy * exact * (1 + 1e-9)
+
+
+@pytest.fixture
+def metrics_frame(tmp_path):
+    path = str(tmp_path / 'metrics.csv')
+    generate_data.write_metrics_csv(path, 3_000, seed=1, months=6)
+    return app.load_aggregated_metrics.__wrapped__(path)
+
+
+def test_cube_rollups_match_pandas_sums(metrics_frame):
+    cube = app.MetricsCube(metrics_frame)
+    measures = metrics_frame[app.CUBE_MEASURES].astype('int64')
+    for month, market in [(None, None), (cube.months[-1], None), (None, cube.markets[0]),
+                          (cube.months[0], cube.markets[-1]), ('01-1999', None)]:
+        keep = pd.Series(True, index=metrics_frame.index)
+        if month is not None:
+            keep &= metrics_frame['MONTH'].astype(str) == month
+        if market is not None:
+            keep &= metrics_frame['MARKET'].astype(str) == market
+        expected = measures[keep].sum().to_dict() if keep.any() else None
+        assert cube.rollup(month, market) == expected
+        for by in ['MONTH', 'MARKET']:
+            sums = (measures[keep].groupby(metrics_frame[by][keep].astype(str)).sum()
+                    .reset_index())
+            rollup = cube.rollup(month, market, by=by)
+            rollup[by] = rollup[by].astype(str)
+            pd.testing.assert_frame_equal(
+                rollup[[by] + app.CUBE_MEASURES].sort_values(by, ignore_index=True),
+                sums.sort_values(by, ignore_index=True), check_dtype=False)
+
+
+def test_filter_index_select_matches_a_boolean_mask(roster_csv):
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    index = app.FilterIndex(df, app.ROSTER_INDEX_COLUMNS)
+    state = index.options('CNT_STATE')[0]
+    lob = index.options('LOB')[-1]
+    org = df['ORG_NM'].astype(str).mode()[0]
+    for filters in [{}, {'CNT_STATE': state}, {'CNT_STATE': state, 'LOB': lob},
+                    {'ORG_NM': org, 'LOB': None}, {'CNT_STATE': 'nowhere'}]:
+        mask = pd.Series(True, index=df.index)
+        for col, value in filters.items():
+            if value is not None:
+                mask &= df[col].astype(str) == value
+        pd.testing.assert_frame_equal(index.select(**filters), df[mask])
+
+
+def test_normalize_months_parses_mixed_formats():
+    labels, periods = app.normalize_months(
+        pd.Series(['01-2025', '2025-02', ' 2024-12', None, 'not a month', '02-2025']))
+    assert labels.tolist() == ['01-2025', '02-2025', '12-2024', 'Unknown', 'Unknown', '02-2025']
+    assert list(labels.cat.categories) == ['12-2024', '01-2025', '02-2025', 'Unknown']
+    assert periods.isna().tolist() == [False, False, False, True, True, False]
+    assert periods.dropna().astype(str).tolist() == ['2025-01', '2025-02', '2024-12', '2025-02']
+
+
+def test_rank_failures_matches_groupby(roster_csv):
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    failed = df[df['IS_FAILED'] == 1]
+    ranking = app.rank_failures(df, app.FAILURE_DIMENSIONS, 5)
+    assert set(ranking) == set(app.FAILURE_DIMENSIONS)
+    for col in app.FAILURE_DIMENSIONS:
+        counts = (failed[col].astype(str).value_counts().rename_axis(col)
+                  .reset_index(name='Failure Count'))
+        expected = counts.sort_values(['Failure Count', col], ascending=[False, True],
+                                      ignore_index=True).head(5)
+        actual = ranking[col].assign(**{col: ranking[col][col].astype(str)})
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_merge_chains_across_parts_matches_a_groupby(roster_csv):
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    chains = app.RetryChains(roster_csv)
+    # Row slices split the runs of a roster across parts
+    parts = [df.iloc[i::3] for i in range(3)]
+    merged = chains.merge([chains.summarize(part) for part in parts])
+    whole = chains.merge([chains.summarize(df)])
+    pd.testing.assert_frame_equal(merged.sort_values('RO_ID', ignore_index=True),
+                                  whole.sort_values('RO_ID', ignore_index=True), check_dtype=False,
+                                  check_categorical=False)
+    
+    runs = df.sort_values(['RO_ID', 'RUN_NO'])
+    grouped = runs.groupby('RO_ID', observed=True)
+    expected = pd.DataFrame({
+        'RUNS': grouped.size(),
+        'FIRST_RUN_NO': grouped['RUN_NO'].first(),
+        'LATEST_RUN_NO': grouped['RUN_NO'].last(),
+        'FIRST_FAILED': grouped['IS_FAILED'].first() == 1,
+        'STILL_FAILING': grouped['IS_FAILED'].last() == 1,
+        'RECOVERED': (grouped['IS_FAILED'].first() == 1) & (grouped['IS_FAILED'].min() == 0),
+    })
+    actual = merged.set_index('RO_ID')[expected.columns].loc[expected.index]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_names=False)
+
+
+def test_distinct_counts_are_exact_or_within_the_hll_error():
+    ids = [f'RO{i:06d}' for i in range(20_000)]
+    df = pd.DataFrame({
+        'RO_ID': ids + ids[:3_000] + ids[:3_000],
+        'CNT_STATE': ['NY'] * 20_000 + ['TX'] * 6_000,
+        app.ROSTER_MONTH_COLUMN: '2025-06-01',
+    })
+    halves = [app.DistinctSketch.from_frame(df.iloc[i::2], 'RO_ID') for i in range(2)]
+    sketch = app.DistinctSketch.merge(halves)
+    assert sketch.count(state='TX') == (3_000, True)
+    count, exact = sketch.count()
+    assert not exact
+    # Four standard errors of a 2^HLL_PRECISION-register HyperLogLog
+    assert abs(count - 20_000) <= 4 * 1.04 / np.sqrt(1 << app.HLL_PRECISION) * 20_000
+    assert app.DistinctSketch.from_frame(df, 'RO_ID').count() == (count, False)
+
+
+def test_superseded_sqlite_database_outlives_the_rebuild(roster_csv, monkeypatch):
+    build = app.load_sqlite_roster.__wrapped__
+    tail = _split_csv(roster_csv, 1_500)
+    old = build(roster_csv, app.source_version(roster_csv))
+    _append(roster_csv, tail)
+    new = build(roster_csv, app.source_version(roster_csv))
+    assert (old.count(), new.count()) == (1_500, 2_000)
+    # The old snapshot keeps working until its replacement is old enough
+    assert len(old.failure_page(page_size=5)) == 5
+    assert not [name for name in os.listdir(app.CACHE_DIR) if name.endswith('.tmp')]
+    
+    monkeypatch.setattr(app, 'SQLITE_RETAIN_SECONDS', -1)
+    app.remove_superseded_sqlite(new.db_path)
+    assert not os.path.exists(old.db_path)
+    assert new.count() == 2_000
+
+
+def test_previous_version_is_served_without_parsing_the_csv(roster_csv, monkeypatch):
+    tail = _split_csv(roster_csv, 1_500)
+    old = app.source_version(roster_csv)
+    app.load_cached_frame(roster_csv, app.read_roster_csv)
+    _append(roster_csv, tail)
+    new = app.source_version(roster_csv)
+    counts = app.DistinctCounts(roster_csv)
+    assert counts.get(new)['RO_ID'].count()[0] > 0
+    
+    parsed = []
+    read_roster_csv = app.read_roster_csv
+    monkeypatch.setattr(app, 'read_roster_csv',
+                        lambda *args, **kwargs: parsed.append(1) or read_roster_csv(*args, **kwargs))
+    # The layout before the append serves the old version, even to a new index
+    assert len(app.load_cached_frame(roster_csv, app.read_roster_csv,
+                                     end=app.source_ends(roster_csv, old)[roster_csv])) == 1_500
+    fresh = app.DistinctCounts(roster_csv)
+    for version in [old, new, old, new]:
+        fresh.get(version)
+        counts.get(version)
+    assert parsed == []
+    assert fresh.get(old) is fresh.get(old)
+    # A kept version is served while another version is being built
+    with counts._build_lock:
+        reader = threading.Thread(target=counts.get, args=(old,))
+        reader.start()
+        reader.join(5)
+        assert not reader.is_alive()
+
+
+def test_partition_workers_do_not_inherit_held_locks(roster_csv, tmp_path):
+    tail = _split_csv(roster_csv, 1_000)
+    header = open(roster_csv, 'rb').readline()
+    paths = [roster_csv, str(tmp_path / 'roster-2.csv')]
+    _append(paths[1], header + tail)
+    held = threading.Event()
+    
+    def hold_lock():
+        with app._cache_lock(app._cache_dir(paths[0])):
+            held.set()
+            time.sleep(2)
+    
+    results = []
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait()
+    loader = threading.Thread(target=lambda: results.append(
+        app.load_partitions(paths, app._load_roster_partition, workers=2)), daemon=True)
+    loader.start()
+    loader.join(120)
+    holder.join()
+    assert not loader.is_alive()
+    assert [len(df) for df in results[0]] == [1_000, 1_000]
+    assert sorted(os.listdir(app.CACHE_DIR)) == sorted(
+        os.path.basename(app._cache_dir(path)) for path in paths)
+
+
+def test_view_cache_bounds_frames_inside_containers():
+    frame = pd.DataFrame({'a': np.arange(100_000, dtype='int64')})
+    assert app._view_size({'a': frame}) >= 800_000
+    assert app._view_size(({'b': [frame, frame]}, 1)) >= 1_600_000
+    
+    cache = app.ViewCache(max_entries=100, max_bytes=3_000_000)
+    for i in range(10):
+        cache.get_or_build(('ranking', i), lambda: {'ORG_NM': frame.copy(), 'LOB': frame.copy()})
+        assert cache.bytes <= cache.max_bytes
+    assert len(cache) == 1
+    assert cache.bytes == sum(size for _, size in cache._entries.values())
+
+
+@pytest.mark.parametrize('sort_by,ascending,statuses', [
+    ('LAST_UPDT_DT', False, None),
+    ('ORG_NM', True, ['Timeout', 'Load Error']),
+    ('RUN_NO', False, ['Schema Mismatch']),
+])
+def test_failure_pages_and_exports_match_a_sorted_frame(roster_csv, sort_by, ascending, statuses):
+    import io
+    
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    failed = df[df['IS_FAILED'] == 1]
+    if statuses:
+        failed = failed[failed['FAILURE_STATUS'].isin(statuses)]
+    expected = failed.sort_values(sort_by, ascending=ascending, kind='stable',
+                                  na_position='last')[app.FAILURE_DETAIL_COLUMNS]
+    order = app.failure_order(df, sort_by, ascending, statuses)
+    assert len(order) == len(expected)
+    
+    pd.testing.assert_frame_equal(app.failure_page(df, order, 2, 25), expected.iloc[50:75])
+    pages = [app.failure_page(df, order, page, 25) for page in range(-(-len(order) // 25))]
+    pd.testing.assert_frame_equal(pd.concat(pages), expected)
+    
+    csv = io.BytesIO()
+    app.write_failures_csv(app.failure_chunks(df, order, chunk_rows=40), csv)
+    csv.seek(0)
+    assert csv.getvalue().count(b'RO_ID') == 1
+    pd.testing.assert_series_equal(pd.read_csv(csv, dtype={'RO_ID': str})['RO_ID'],
+                                   expected['RO_ID'].reset_index(drop=True), check_dtype=False)
+    
+    parquet = io.BytesIO()
+    app.write_failures_parquet(app.failure_chunks(df, order, chunk_rows=40), parquet)
+    parquet.seek(0)
+    pd.testing.assert_frame_equal(pd.read_parquet(parquet), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+def test_lttb_keeps_the_endpoints():
+    rng = np.random.default_rng(0)
+    x = np.arange(5_000, dtype=float)
+    y = np.cumsum(rng.normal(size=len(x)))
+    keep = app.lttb_indices(x, y, 300)
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    # The global extremes survive because they dominate their bucket's triangle
+    assert {int(np.argmax(y)), int(np.argmin(y))} <= set(keep.tolist())
+
+
+def test_enforce_point_budget_caps_every_trace_type():
+    import plotly.graph_objects as go
+    
+    rng = np.random.default_rng(0)
+    x = np.arange(6_000, dtype=float)
+    y = np.cumsum(rng.normal(size=len(x)))
+    bars = rng.integers(1, 100, size=4_000).astype(float)
+    fig = go.Figure([
+        go.Scatter(x=x, y=y),
+        go.Box(y=rng.exponential(size=20_000), name='durations'),
+        go.Bar(x=[f'stage {i}' for i in range(len(bars))], y=bars, marker_color=bars),
+    ])
+    app.enforce_point_budget(fig, budget=900)
+    assert app.figure_points(fig) <= 900
+    
+    line, _, bar = fig.data
+    assert line.x[0] == x[0] and line.x[-1] == x[-1]
+    assert line.y[0] == y[0] and line.y[-1] == y[-1]
+    assert bar.x[-1] == 'Other'
+    assert sum(bar.y) == bars.sum()
+    assert bar.marker.color[-1] == app.OTHER_BAR_COLOR
+
+
+@pytest.mark.parametrize('rows,months,chunk_rows', [(3_000, 6, 700), (50, 24, 7), (481, 12, 100)])
+def test_metrics_csv_keeps_the_newest_months_in_month_order(tmp_path, rows, months, chunk_rows):
+    path = str(tmp_path / 'metrics.csv')
+    assert generate_data.write_metrics_csv(path, rows, months=months, end_month='2024-05',
+                                           chunk_rows=chunk_rows) == rows
+    df = pd.read_csv(path, dtype={'CLIENT_ID': str})
+    assert len(df) == rows and df['ID'].tolist() == list(range(1, rows + 1))
+    month = pd.to_datetime(df['MONTH'], format='%m-%Y')
+    assert month.is_monotonic_increasing
+    assert month.max() == pd.Timestamp('2024-05-01')
+    assert month.nunique() == min(rows, months)
+    assert not df.duplicated(['MONTH', 'MARKET', 'CLIENT_ID']).any()
+
+
+def test_out_of_range_flags_do_not_wrap_into_failures(roster_csv):
+    raw = pd.read_csv(roster_csv, nrows=6)
+    raw['IS_FAILED'] = [0, 1, 257, -255, 2, 'x']
+    raw['IS_STUCK'] = [1, 0, 513, 1.0, -1, None]
+    raw.to_csv(roster_csv, index=False)
+    df = app.read_roster_csv(roster_csv)
+    assert df['IS_FAILED'].dtype == 'int8' and df['IS_STUCK'].dtype == 'int8'
+    assert df['IS_FAILED'].tolist() == [0, 1, 0, 0, 0, 0]
+    assert df['IS_STUCK'].tolist() == [1, 0, 0, 1, 0, 0]
+
+
+def _serve_snapshot(monkeypatch, cube, roster_path=None):
+    """Point the API at a data store holding ``cube`` and the roster at ``roster_path``"""
+    roster_version = None
+    if roster_path is not None:
+        monkeypatch.setattr(app, 'ROSTER_CSV', roster_path)
+        roster_version = app.source_version(roster_path)
+    snapshot = app.Snapshot(('metrics',), roster_version, cube, pd.Timestamp('2026-01-01'))
+    store = type('Store', (), {'snapshot': snapshot})
+    monkeypatch.setattr(app, 'get_data_store', lambda: store)
+
+
+@pytest.mark.parametrize('month,market,state', [
+    (None, None, None), ('11-2025', 'TX', 'CA'), ('08-2025', None, 'TX'), ('12-2025', 'NY', None),
+])
+def test_report_kpis_match_compute_kpis(roster_csv, metrics_frame, monkeypatch,
+                                        month, market, state):
+    cube = app.MetricsCube(metrics_frame)
+    _serve_snapshot(monkeypatch, cube, roster_csv)
+    kpis = api.report(month, market, state, sections=['kpis'])['kpis']
+    
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    if month is not None:
+        df = app.filter_months(df, (app.month_partition(month),))
+    if state is not None:
+        df = df[df['CNT_STATE'] == state]
+    expected = api._plain(app.compute_kpis(cube, df, month, market))
+    assert kpis['distinct']['ORG_NM'] == {'count': expected['total_organizations'], 'exact': True}
+    assert {k: v for k, v in kpis.items() if k != 'distinct'} == expected
+
+
+def test_report_without_a_roster_has_empty_roster_sections(metrics_frame, monkeypatch):
+    cube = app.MetricsCube(metrics_frame)
+    _serve_snapshot(monkeypatch, cube)
+    result = api.report('11-2025', 'TX', 'CA')
+    assert result['kpis'] == dict(api._plain(app.compute_kpis(cube, None, '11-2025', 'TX')),
+                                  distinct=None)
+    assert 'stages' not in result
+    assert result['failures'] == {} and result['durations'] == []
+    assert result['recovery']['summary']['rosters'] == 0
+    assert all(rows == [] for rows in result['latency'].values())
+    assert api.options()['states'] == []
+
+
+def test_published_frame_attaches_unchanged_and_read_only(roster_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'DATA_PLANE_DIR', str(tmp_path / 'plane'))
+    os.makedirs(app.DATA_PLANE_DIR)
+    df = app.load_cached_frame(roster_csv, app.read_roster_csv)
+    pointer = app.publish_frame('roster', app.source_version(roster_csv), df,
+                                split_by=app.month_keys)
+    # Rows are published grouped by month, in their original order within one
+    months = app.month_keys(df)
+    expected = df.take(np.argsort(months.to_numpy(), kind='stable')).reset_index(drop=True)
+    
+    attached = app.attach_frame(pointer)
+    assert pointer['rows'] == len(df)
+    pd.testing.assert_frame_equal(attached, expected)
+    assert isinstance(attached['ORG_NM'].dtype, pd.CategoricalDtype)
+    assert attached['RO_ID'].tolist() == expected['RO_ID'].tolist()
+    
+    keys = ('2025-03', '2025-07', '1999-01')
+    sliced = app.attach_frame(pointer, keys)
+    pd.testing.assert_frame_equal(sliced, expected[app.month_keys(expected).isin(keys)]
+                                  .reset_index(drop=True))
+    empty = app.attach_frame(pointer, ('1999-01',))
+    assert empty.empty and list(empty.columns) == list(df.columns)
+    
+    # Mapped columns share the file's pages, so writes must fail
+    single = app.attach_frame(pointer, ('2025-03',))
+    assert len(single) == pointer['offsets']['2025-03'][1]
+    for frame in (attached, single):
+        for col in ['RUN_NO', 'IS_FAILED', 'PRE_PROCESSING_DURATION', 'LAST_UPDT_DT']:
+            assert not frame[col].to_numpy().flags.writeable
+        assert not frame['ORG_NM'].cat.codes.to_numpy().flags.writeable
+        with pytest.raises(ValueError, match='read-only'):
+            frame.loc[0, 'RUN_NO'] = 9
+
+
 def main():
     print("=" * 60)
     print("Roster Dashboard Validation Test")